@@ -20,6 +20,11 @@ import asyncio
 import aiohttp
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C 实现，解析更快
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from .config import config
 from .pdf_parser import PDFContent
 
@@ -128,7 +133,7 @@ class AIProcessor:
         config_path = self._get_device_config_path(device_type)
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+                data = yaml.load(f, Loader=_YamlLoader) or {}
             self._config_cache[device_type] = data
             logger.info(f"加载器件配置: {config_path.name}")
             return data
@@ -142,7 +147,7 @@ class AIProcessor:
         try:
             if notes_path.exists():
                 with open(notes_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
                 return data.get('notes', []) or []
         except Exception as e:
             logger.warning(f"加载注意文档失败 {notes_path}: {e}")
@@ -529,8 +534,8 @@ class AIProcessor:
         if not device_type:
             device_type = 'Si MOSFET'  # 默认
 
-        # 2. 获取结构化PDF内容（不截断）
-        structured_content = parser.get_structured_content(pdf_content)
+        # 2. 获取结构化PDF内容（不截断；已知文件哈希时复用缓存）
+        structured_content = parser.get_structured_content_cached(pdf_content)
 
         # 3. 加载配置和注意文档
         param_groups = self._get_param_groups(device_type)
@@ -4,6 +4,7 @@
 处理密码加密、JWT Token 生成与验证
 """
 
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 from jose import JWTError, jwt
@@ -17,9 +18,16 @@ from app.models.user import User
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+# 桌面端 UserManager 写入的预哈希格式标记：bcrypt(hex(sha256(密码)))
+PREHASH_TAG = "sh256$"
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
+    """验证密码（兼容预哈希格式）"""
     try:
+        if hashed_password.startswith(PREHASH_TAG):
+            digest = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
+            return pwd_context.verify(digest, hashed_password[len(PREHASH_TAG):])
         return pwd_context.verify(plain_password, hashed_password)
     except Exception:
         return False
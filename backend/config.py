@@ -29,6 +29,9 @@ DATABASE_PATH = DATA_DIR / "params.db"
 # 配置文件路径
 CONFIG_FILE = DATA_DIR / "config.json"
 
+# bcrypt加密轮数（每+1耗时翻倍，安全性与登录延迟的折中，可通过环境变量调整）
+BCRYPT_COST = int(os.environ.get("BCRYPT_COST", 12))
+
 
 @dataclass
 class AIConfig:
@@ -47,6 +50,7 @@ class ParserConfig:
     pdf_timeout: int = 30  # 单个PDF解析超时时间（秒）
     max_workers: int = 4  # 最大并行工作进程数
     batch_size: int = 10  # 批处理大小
+    prefer_pymupdf: bool = True  # 优先使用PyMuPDF解析（更快），内容不足时回退pdfplumber
 
 
 @dataclass
@@ -115,6 +119,7 @@ class Config:
                 'pdf_timeout': self.parser.pdf_timeout,
                 'max_workers': self.parser.max_workers,
                 'batch_size': self.parser.batch_size,
+                'prefer_pymupdf': self.parser.prefer_pymupdf,
             },
             'ui': {
                 'primary_color': self.ui.primary_color,
@@ -7,6 +7,7 @@
 
 import os
 import logging
+from collections import namedtuple
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -21,6 +22,9 @@ from .ai_processor import ExtractionResult, ExtractedParam
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 与解析结果表一行等价的轻量记录（供生成表格时直接使用内存中的提取结果）
+_ParamRow = namedtuple('_ParamRow', 'param_name param_value opn manufacturer device_type')
+
 
 class DataWriter:
     """
@@ -422,7 +426,8 @@ class DataWriter:
     MISSING_FONT = Font(color="D97706", italic=True)
     
     def generate_table_by_conditions(self, device_type: str, pdf_list: List[str],
-                                     created_by: str = None, user_id: int = None) -> Dict[str, Any]:
+                                     created_by: str = None, user_id: int = None,
+                                     preloaded_results: List[ExtractionResult] = None) -> Dict[str, Any]:
         """
         按条件生成参数表格（支持用户隔离）
         
@@ -445,6 +450,8 @@ class DataWriter:
             pdf_list: PDF文件列表
             created_by: 创建用户名
             user_id: 用户ID，用于数据隔离
+            preloaded_results: 刚由 write_to_database 写入的提取结果（可选），
+                传入时直接用其生成表格，不再从数据库回读解析结果
             
         Returns:
             包含生成结果的字典：
@@ -462,7 +469,20 @@ class DataWriter:
         try:
             # 步骤1：获取表格数据（按用户过滤）
             logger.info(f"生成表格: 器件类型={device_type}, PDF列表={pdf_list}, user_id={user_id}")
-            table_data = self.db_manager.get_params_for_table(device_type, pdf_list, user_id=user_id)
+            rows_by_pdf = None
+            if preloaded_results is not None:
+                # 与 write_to_database 写入的行一一对应
+                rows_by_pdf = {
+                    result.pdf_name: [
+                        _ParamRow(param.standard_name, param.value, result.opn,
+                                  result.manufacturer, result.device_type)
+                        for param in result.params
+                    ]
+                    for result in preloaded_results if not result.error
+                }
+            table_data = self.db_manager.get_params_for_table(
+                device_type, pdf_list, user_id=user_id, preloaded_results=rows_by_pdf
+            )
             
             logger.info(f"获取到 {len(table_data.get('data', []))} 行数据")
             
@@ -5,21 +5,74 @@
 """
 
 import re
+import time
 import logging
+import threading
 import yaml
+from contextlib import contextmanager
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, text
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Tuple, Iterator
+from sqlalchemy import create_engine, select, func, Index, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, relationship, Session
 from sqlalchemy.pool import StaticPool
 
 from .config import DATABASE_PATH
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C 实现，解析更快
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 筛选参数列表缓存有效期（秒），前端下拉框频繁轮询，参数集合变化很少
+FILTER_PARAMS_CACHE_TTL = 60
+# 标准参数信息缓存有效期（秒），标准参数库极少变动
+STANDARD_PARAMS_CACHE_TTL = 600
+
+# SQL编译缓存容量：search_params 等动态拼接的查询按语句结构复用编译结果
+SQL_QUERY_CACHE_SIZE = 1200
+
+# 器件类型 -> device_configs 下的YAML文件名
+_DEVICE_CONFIG_KEYS = MappingProxyType({'Si MOSFET': 'si_mosfet', 'SiC MOSFET': 'sic_mosfet', 'IGBT': 'igbt'})
+
+# 旧参数名 -> 新参数名（兼容已存储的旧数据）
+_LEGACY_PARAM_MAPPING = MappingProxyType({
+    # Si/SiC MOSFET: RDS(on) 与 Ron 互为别名
+    'RDS(on) 10V_type': 'Ron 10V_type', 'RDS(on) 10V_max': 'Ron 10V_max',
+    'RDS(on) 4.5V_type': 'Ron 4.5V_type', 'RDS(on) 4.5V_max': 'Ron 4.5V_max',
+    'RDS(on) 2.5V_type': 'Ron 2.5V_type', 'RDS(on) 2.5V_max': 'Ron 2.5V_max',
+    # IGBT 旧名 -> 新名（带单位后缀的 Excel 列名）
+    'Cies': 'Cies（pF）', 'Coes': 'Coes（pF）', 'Cres': 'Cres（pF）',
+    'tdon 25℃': 'tdon 25℃（ns）', 'tdon 175℃': 'tdon 175℃（ns）',
+    'tr 25℃': 'tr 25℃（ns）', 'tr 175℃': 'tr175℃（ns）',
+    'tdoff 25℃': 'tdoff 25℃（ns）', 'tdoff 175℃': 'tdoff 175℃（ns）',
+    'tf 25℃': 'tf 25℃（ns）', 'tf 175℃': 'tf 175℃（ns）',
+    'trr 25℃': 'trr 25℃（ns）',
+    'Eon 25℃': 'Eon 25℃（uJ）', 'Eon 175℃': 'Eon 175℃（uJ）',
+    'Eoff 25℃': 'Eoff（uJ）', 'Eoff 175℃': 'Eoff 175℃（uJ）',
+    'Ets 25℃': 'Ets 25℃（uJ）', 'Ets 175℃': 'Ets 175℃（uJ）',
+    'QG_IGBT': 'QG(nc)', 'QGE': 'QGE(nc)', 'QGC': 'QGC(nc)',
+    'Qrr 25℃_IGBT': 'Qrr 25℃（uC）', 'Qrr 175℃_IGBT': 'Qrr 175℃',
+})
+
+# 数据库 param 名 -> YAML 列名（用于行数据 key，保证与 YAML 列一致）
+_DB_TO_COLUMN = MappingProxyType({'gfs_IGBT': 'gfs'})
+
+# 数值筛选时跳过的基本信息类参数（非数值型）
+_SKIP_FILTER_PARAMS = frozenset({
+    'PDF文件名', '厂家', 'OPN', '厂家封装名', '技术', '封装',
+    '特殊功能', '极性', 'Product Status', '认证', '安装', 'ESD',
+    '预算价格€/1k', 'Qg测试条件', 'Ciss测试条件',
+    '开关时间测试条件', 'Qrr测试条件', 'EAS测试条件', 'IDM限制条件',
+})
+
 # 创建基类
 Base = declarative_base()
 
@@ -141,6 +194,11 @@ class UserLog(Base):
     记录用户的所有操作行为
     """
     __tablename__ = 'user_logs'
+    __table_args__ = (
+        # get_user_logs：按用户筛选并按时间倒序/范围过滤，一次索引范围扫描，免排序
+        Index('ix_userlog_user_time', 'user_id', 'created_at'),
+        Index('ix_userlog_action', 'action'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
@@ -176,6 +234,56 @@ class TableRecord(Base):
         return f"<TableRecord(id={self.id}, name='{self.table_name}')>"
 
 
+# 已创建的引擎（按数据库URL复用），同一进程内多个 DatabaseManager 共享引擎与编译缓存
+_ENGINES: Dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# 可筛选参数缓存（按数据库URL共享）：URL -> {user_id: (过期时间戳, 结果列表)}
+# 同一进程内各 DatabaseManager 实例（如 UI 缓存实例与后台解析线程的实例）共用同一份缓存及其失效
+_FILTER_PARAMS_CACHES: Dict[str, Dict[Optional[int], Tuple[float, List[Dict[str, Any]]]]] = {}
+# 标准参数顺序缓存（按数据库URL共享）：URL -> (版本号 (max(id), count(id)), {param_name: 序号})
+_STD_ORDER_CACHES: Dict[str, Tuple[Tuple[Optional[int], int], Dict[str, int]]] = {}
+
+
+def _ensure_model_indexes(bind) -> None:
+    """
+    已有数据库补建模型声明的索引
+    create_all 只为新建的表建索引，旧库中已存在的表需按 __table_args__ 的定义逐个补建
+    """
+    for idx in UserLog.__table__.indexes:
+        idx.create(bind, checkfirst=True)
+
+
+def _get_engine(db_path: str) -> Engine:
+    """
+    获取（或创建）指定数据库文件的引擎
+    首次创建时建表并预热连接，之后直接复用，避免重复 create_all 检查表结构
+    """
+    url = f'sqlite:///{db_path}'
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(url)
+        if engine is None:
+            # 创建引擎（SQLite使用特殊配置以支持多线程）
+            engine = create_engine(
+                url,
+                connect_args={'check_same_thread': False},
+                poolclass=StaticPool,
+                query_cache_size=SQL_QUERY_CACHE_SIZE,
+                echo=False
+            )
+            
+            # 创建所有表，并为已有的表补建索引
+            Base.metadata.create_all(engine)
+            _ensure_model_indexes(engine)
+            
+            # 预热连接，首个请求无需再建立连接；同时开启WAL，批量删除/写入时不阻塞并发读
+            with engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            
+            _ENGINES[url] = engine
+        return engine
+
+
 class DatabaseManager:
     """
     数据库管理类
@@ -192,24 +300,59 @@ class DatabaseManager:
         if db_path is None:
             db_path = str(DATABASE_PATH)
         
-        # 创建引擎（SQLite使用特殊配置以支持多线程）
-        self.engine = create_engine(
-            f'sqlite:///{db_path}',
-            connect_args={'check_same_thread': False},
-            poolclass=StaticPool,
-            echo=False
-        )
-        
-        # 创建所有表
-        Base.metadata.create_all(self.engine)
+        # 获取引擎（同一数据库复用）
+        self.engine = _get_engine(db_path)
         
         # 创建会话工厂
         self.SessionLocal = sessionmaker(bind=self.engine)
+        
+        self._db_url = str(self.engine.url)
+        
+        # 可筛选参数缓存：user_id -> (过期时间戳, 结果列表)，同一数据库的实例间共享
+        with _ENGINES_LOCK:
+            self._filter_params_cache = _FILTER_PARAMS_CACHES.setdefault(self._db_url, {})
+        # 标准参数信息缓存：(过期时间戳, {param_name: (unit, param_name_en, category)})
+        self._std_param_info_cache: Optional[Tuple[float, Dict[str, Tuple[str, str, str]]]] = None
     
     def get_session(self) -> Session:
         """获取数据库会话"""
         return self.SessionLocal()
     
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        事务会话上下文：正常退出时提交，异常时回滚，最终总是关闭会话
+        提交后不过期对象属性，返回给调用方的ORM对象在会话关闭后仍可直接读取
+        """
+        session = self.SessionLocal(expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _invalidate_filter_params_cache(self, user_id: int = None):
+        """
+        使可筛选参数缓存失效
+        
+        user_id 为 None 时影响全部用户，清空所有缓存；
+        否则清除该用户及不按用户过滤（None）的缓存项
+        """
+        if user_id is None:
+            self._filter_params_cache.clear()
+        else:
+            self._filter_params_cache.pop(user_id, None)
+            self._filter_params_cache.pop(None, None)
+    
+    def _invalidate_standard_param_cache(self):
+        """标准参数变动后使相关缓存失效"""
+        self._std_param_info_cache = None
+        _STD_ORDER_CACHES.pop(self._db_url, None)
+        self._filter_params_cache.clear()
+    
     # ==================== 标准参数操作 ====================
     
     def add_standard_param(self, param_name: str, param_name_en: str = None,
@@ -258,6 +401,7 @@ class DatabaseManager:
                         session.add(variant)
             
             session.commit()
+            self._invalidate_standard_param_cache()
             logger.info(f"成功添加参数: {param_name}")
             return param
             
@@ -315,6 +459,7 @@ class DatabaseManager:
                     setattr(param, key, value)
             
             session.commit()
+            self._invalidate_standard_param_cache()
             return True
             
         except Exception as e:
@@ -332,6 +477,7 @@ class DatabaseManager:
             if param:
                 session.delete(param)
                 session.commit()
+                self._invalidate_standard_param_cache()
                 return True
             return False
         except Exception as e:
@@ -442,6 +588,7 @@ class DatabaseManager:
             )
             session.add(result)
             session.commit()
+            self._invalidate_filter_params_cache(user_id)
             return result
         except Exception as e:
             session.rollback()
@@ -481,6 +628,7 @@ class DatabaseManager:
                 query = query.filter_by(user_id=user_id)
             query.delete()
             session.commit()
+            self._invalidate_filter_params_cache(user_id)
             return True
         except Exception as e:
             session.rollback()
@@ -498,6 +646,7 @@ class DatabaseManager:
                 query = query.filter_by(user_id=user_id)
             query.delete()
             session.commit()
+            self._invalidate_filter_params_cache(user_id)
             return True
         except Exception as e:
             session.rollback()
@@ -623,6 +772,9 @@ class DatabaseManager:
                 "CREATE INDEX IF NOT EXISTS idx_parse_results_device_type ON parse_results(device_type)",
                 "CREATE INDEX IF NOT EXISTS idx_standard_params_param_name ON standard_params(param_name)",
                 "CREATE INDEX IF NOT EXISTS idx_param_variants_variant_name ON param_variants(variant_name)",
+                # search_params 的排序索引：只索引成功的结果（部分索引），按 pdf_name, param_name 有序，省去排序步骤
+                "CREATE INDEX IF NOT EXISTS idx_parse_results_success_ordered "
+                "ON parse_results(pdf_name, param_name) WHERE is_success = 1",
             ]:
                 session.execute(text(stmt))
             session.commit()
@@ -817,12 +969,10 @@ class DatabaseManager:
             key_completeness_rate = 0.0
             
             try:
-                import yaml
-                from pathlib import Path
                 rules_file = Path(__file__).parent / 'extraction_rules.yaml'
                 if rules_file.exists():
                     with open(rules_file, 'r', encoding='utf-8') as f:
-                        rules = yaml.safe_load(f) or {}
+                        rules = yaml.load(f, Loader=_YamlLoader) or {}
                     high_list = rules.get('extraction_priority', {}).get('high', []) or []
                     # 只统计当前参数库中存在的关键参数
                     key_set = {name for name in high_list if name in all_param_names}
@@ -877,18 +1027,19 @@ class DatabaseManager:
         Returns:
             包含搜索结果、总数、分页信息的字典
         """
-        from sqlalchemy import func, or_
+        from sqlalchemy import or_
         
         session = self.get_session()
         try:
-            # 基础查询
-            query = session.query(ParseResult)
+            # 使用 select() 构造查询，过滤条件按顺序收集；
+            # 相同结构的语句会命中引擎的编译缓存，关键词仅作为绑定参数
+            conditions = []
             
             # 步骤1：根据PDF文件名筛选（支持多关键词）
             if pdf_keyword:
                 fuzzy_filter = self._build_fuzzy_filter(ParseResult.pdf_name, pdf_keyword)
                 if fuzzy_filter is not None:
-                    query = query.filter(fuzzy_filter)
+                    conditions.append(fuzzy_filter)
             
             # 步骤2：根据参数名关键词筛选（支持多关键词）
             if param_keyword:
@@ -897,62 +1048,41 @@ class DatabaseManager:
                 param_keywords = list(self._expand_param_keyword_typos(raw_kws))
                 
                 if param_keywords:
-                    # 查找匹配的标准参数ID
-                    matching_param_ids = set()
+                    kw_patterns = [f'%{kw.lower()}%' for kw in param_keywords]
                     
-                    for kw in param_keywords:
-                        # 匹配标准参数名
-                        std_params = session.query(StandardParam).filter(
-                            func.lower(StandardParam.param_name).like(f'%{kw.lower()}%')
-                        ).all()
-                        for p in std_params:
-                            matching_param_ids.add(p.id)
-                        
-                        # 匹配变体名
-                        variants = session.query(ParamVariant).filter(
-                            func.lower(ParamVariant.variant_name).like(f'%{kw.lower()}%')
-                        ).all()
-                        for v in variants:
-                            matching_param_ids.add(v.param_id)
+                    # 直接模糊匹配param_name字段（同时覆盖了按标准参数名匹配的情况）
+                    param_conditions = [func.lower(ParseResult.param_name).like(pattern) for pattern in kw_patterns]
                     
-                    # 获取匹配的参数名列表
-                    if matching_param_ids:
-                        matching_param_names = session.query(StandardParam.param_name).filter(
-                            StandardParam.id.in_(matching_param_ids)
-                        ).all()
-                        matching_names = [p[0] for p in matching_param_names]
-                        
-                        # 构建参数名过滤条件
-                        param_conditions = [ParseResult.param_name.in_(matching_names)]
-                        
-                        # 同时直接模糊匹配param_name字段
-                        for kw in param_keywords:
-                            param_conditions.append(func.lower(ParseResult.param_name).like(f'%{kw.lower()}%'))
-                        
-                        query = query.filter(or_(*param_conditions))
-                    else:
-                        # 如果没有匹配到标准参数，直接搜索param_name
-                        param_conditions = []
-                        for kw in param_keywords:
-                            param_conditions.append(func.lower(ParseResult.param_name).like(f'%{kw.lower()}%'))
-                        query = query.filter(or_(*param_conditions))
+                    # 变体名匹配：用关联EXISTS子查询代替"先查ID、再查名称、再 IN 列表"的多次往返
+                    variant_match = select(ParamVariant.id).join(
+                        StandardParam, ParamVariant.param_id == StandardParam.id
+                    ).where(
+                        StandardParam.param_name == ParseResult.param_name,
+                        or_(*[func.lower(ParamVariant.variant_name).like(pattern) for pattern in kw_patterns])
+                    ).exists()
+                    param_conditions.append(variant_match)
+                    
+                    conditions.append(or_(*param_conditions))
             
             # 步骤3：筛选器件类型
             if device_types:
-                query = query.filter(ParseResult.device_type.in_(device_types))
+                conditions.append(ParseResult.device_type.in_(device_types))
             
             # 只查询成功的结果
-            query = query.filter(ParseResult.is_success == True)
+            conditions.append(ParseResult.is_success == True)
             
             # 获取总数
-            total_count = query.count()
+            total_count = session.execute(
+                select(func.count()).select_from(ParseResult).where(*conditions)
+            ).scalar_one()
             
             # 分页
             offset = (page - 1) * page_size
-            results = query.order_by(
+            stmt = select(ParseResult).where(*conditions).order_by(
                 ParseResult.pdf_name, 
                 ParseResult.param_name
-            ).offset(offset).limit(page_size).all()
+            ).offset(offset).limit(page_size)
+            results = session.execute(stmt).scalars().all()
             
             # 格式化结果
             search_results = []
@@ -1179,19 +1309,99 @@ class DatabaseManager:
     
     def _get_param_order_from_yaml(self, device_type: str) -> List[str]:
         """从器件类型对应的YAML加载参数列顺序（与Excel严格对齐）"""
-        type_map = {'Si MOSFET': 'si_mosfet', 'SiC MOSFET': 'sic_mosfet', 'IGBT': 'igbt'}
-        key = type_map.get(device_type, 'si_mosfet')
+        key = _DEVICE_CONFIG_KEYS.get(device_type, 'si_mosfet')
         config_path = Path(__file__).parent / 'device_configs' / f'{key}.yaml'
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+                data = yaml.load(f, Loader=_YamlLoader) or {}
             groups = data.get('groups', {})
             return [p['name'] for g, params in groups.items() for p in params]
         except Exception as e:
             logger.warning(f"加载YAML列顺序失败 {config_path}: {e}")
             return []
 
-    def get_params_for_table(self, device_type: str, pdf_list: List[str], user_id: int = None) -> Dict[str, Any]:
+    @staticmethod
+    def _build_table_row(pdf_name: str, results: List[ParseResult], param_name_map: Dict[str, str],
+                         param_names: List[str], param_name_set: set) -> Dict[str, str]:
+        """
+        将单个PDF的解析结果整理为表格的一行（纯函数，不访问数据库）
+        
+        Args:
+            pdf_name: PDF文件名
+            results: 该PDF的解析结果（按ID顺序）
+            param_name_map: 参数名/变体名/标准化名 -> 标准参数名
+            param_names: 表格列顺序
+            param_name_set: param_names 的集合形式，用于快速判断
+            
+        Returns:
+            列名 -> 单元格值 的字典
+        """
+        # 构建参数值映射（使用标准参数名作为key）
+        param_values = {}
+        opn = '-'
+        manufacturer = '-'
+        device_type = '-'
+        package = '-'
+        
+        # 即使没有解析结果，也继续处理（会生成一行空数据）
+        for r in results:
+            if r.param_name:
+                # 参数值：只保留纯数值+单位，测试条件不拼接
+                value = r.param_value or '-'
+                
+                # 尝试匹配到标准参数名
+                # 1. 精确匹配
+                matched_name = param_name_map.get(r.param_name)
+                if matched_name is None:
+                    # 2. 标准化后匹配
+                    normalized_name = r.param_name.lower().replace(' ', '').replace('_', '').replace('-', '')
+                    matched_name = param_name_map.get(normalized_name)
+                
+                if matched_name:
+                    # 用 YAML 列名作为 key，便于与 param_names 对齐（如 gfs_IGBT -> gfs）
+                    store_key = _DB_TO_COLUMN.get(matched_name, matched_name)
+                    if store_key in param_name_set:
+                        param_values[store_key] = value
+                    else:
+                        param_values[matched_name] = value
+                else:
+                    param_values[r.param_name] = value
+                
+                # 尝试获取封装信息
+                if '封装' in r.param_name and r.param_value:
+                    package = r.param_value
+            
+            # 提取型号、厂家和器件类型
+            if r.opn:
+                opn = r.opn
+            if r.manufacturer:
+                manufacturer = r.manufacturer
+            if r.device_type:
+                device_type = r.device_type
+        
+        # 填充各参数列（所有列都从参数库获取）
+        row = {}
+        for param_name in param_names:
+            if param_name in ('PDF文件名', '文件名'):
+                row[param_name] = pdf_name
+            elif param_name == '厂家':
+                # 优先使用解析结果中的厂家
+                row[param_name] = manufacturer if manufacturer != '-' else param_values.get(param_name, '-')
+            elif param_name == 'OPN':
+                # 优先使用解析结果中的OPN
+                row[param_name] = opn if opn != '-' else param_values.get(param_name, '-')
+            elif param_name == '技术':
+                # 技术类型可以从device_type推断
+                row[param_name] = param_values.get(param_name, device_type if device_type != '-' else '-')
+            elif param_name == '封装' or param_name == '厂家封装名':
+                row[param_name] = param_values.get(param_name, package if package != '-' else '-')
+            else:
+                row[param_name] = param_values.get(param_name, '-')
+        
+        return row
+
+    def get_params_for_table(self, device_type: str, pdf_list: List[str], user_id: int = None,
+                             preloaded_results: Dict[str, List[Any]] = None) -> Dict[str, Any]:
         """
         获取用于生成表格的参数数据（按用户过滤）
         
@@ -1209,6 +1419,8 @@ class DatabaseManager:
             device_type: 器件类型
             pdf_list: PDF文件列表
             user_id: 用户ID，用于数据隔离
+            preloaded_results: 调用方已持有的解析结果（PDF文件名 -> 行对象列表，需有
+                param_name/param_value/opn/manufacturer/device_type 属性），传入时不再查询解析结果表
             
         Returns:
             包含表头和数据行的字典
@@ -1223,6 +1435,13 @@ class DatabaseManager:
             else:
                 all_params = session.query(StandardParam).all()
             
+            # 一次查询加载全部变体，按参数ID分组（避免逐个参数查询）
+            variants_by_param = defaultdict(list)
+            for param_id, variant_name in session.query(
+                ParamVariant.param_id, ParamVariant.variant_name
+            ).order_by(ParamVariant.id).all():
+                variants_by_param[param_id].append(variant_name)
+            
             # 构建参数名映射表（用于模糊匹配）
             # key: 标准化后的名称（小写、去空格）, value: 原始标准参数名
             param_name_map = {}
@@ -1239,123 +1458,39 @@ class DatabaseManager:
                     param_name_map[en_normalized] = p.param_name  # 标准化英文名
                 
                 # 添加变体名映射
-                variants = session.query(ParamVariant).filter_by(param_id=p.id).all()
-                for v in variants:
-                    variant_normalized = v.variant_name.lower().replace(' ', '').replace('_', '').replace('-', '')
+                for variant_name in variants_by_param.get(p.id, ()):
+                    variant_normalized = variant_name.lower().replace(' ', '').replace('_', '').replace('-', '')
                     param_name_map[variant_normalized] = p.param_name
-                    param_name_map[v.variant_name] = p.param_name  # 精确匹配变体名
-            
-            # 旧参数名 -> 新参数名（兼容已存储的旧数据）
-            legacy_mapping = {
-                # Si/SiC MOSFET: RDS(on) 与 Ron 互为别名
-                'RDS(on) 10V_type': 'Ron 10V_type', 'RDS(on) 10V_max': 'Ron 10V_max',
-                'RDS(on) 4.5V_type': 'Ron 4.5V_type', 'RDS(on) 4.5V_max': 'Ron 4.5V_max',
-                'RDS(on) 2.5V_type': 'Ron 2.5V_type', 'RDS(on) 2.5V_max': 'Ron 2.5V_max',
-                # IGBT 旧名 -> 新名（带单位后缀的 Excel 列名）
-                'Cies': 'Cies（pF）', 'Coes': 'Coes（pF）', 'Cres': 'Cres（pF）',
-                'tdon 25℃': 'tdon 25℃（ns）', 'tdon 175℃': 'tdon 175℃（ns）',
-                'tr 25℃': 'tr 25℃（ns）', 'tr 175℃': 'tr175℃（ns）',
-                'tdoff 25℃': 'tdoff 25℃（ns）', 'tdoff 175℃': 'tdoff 175℃（ns）',
-                'tf 25℃': 'tf 25℃（ns）', 'tf 175℃': 'tf 175℃（ns）',
-                'trr 25℃': 'trr 25℃（ns）',
-                'Eon 25℃': 'Eon 25℃（uJ）', 'Eon 175℃': 'Eon 175℃（uJ）',
-                'Eoff 25℃': 'Eoff（uJ）', 'Eoff 175℃': 'Eoff 175℃（uJ）',
-                'Ets 25℃': 'Ets 25℃（uJ）', 'Ets 175℃': 'Ets 175℃（uJ）',
-                'QG_IGBT': 'QG(nc)', 'QGE': 'QGE(nc)', 'QGC': 'QGC(nc)',
-                'Qrr 25℃_IGBT': 'Qrr 25℃（uC）', 'Qrr 175℃_IGBT': 'Qrr 175℃',
-            }
-            # 数据库 param 名 -> YAML 列名（用于行数据 key，保证与 YAML 列一致）
-            db_to_column = {'gfs_IGBT': 'gfs'}
-            for old_name, new_name in legacy_mapping.items():
-                if new_name in [p.param_name for p in all_params]:
+                    param_name_map[variant_name] = p.param_name  # 精确匹配变体名
+            
+            # 旧参数名映射到当前参数库中存在的新参数名
+            std_param_names = {p.param_name for p in all_params}
+            for old_name, new_name in _LEGACY_PARAM_MAPPING.items():
+                if new_name in std_param_names:
                     param_name_map[old_name] = new_name
                     # 标准化形式也映射
                     old_normalized = old_name.lower().replace(' ', '').replace('_', '').replace('-', '')
                     param_name_map[old_normalized] = new_name
             
-            # 获取每个PDF的解析结果
-            table_data = []
-            
-            for pdf_name in pdf_list:
-                # 查询该PDF的所有解析结果（按用户过滤）
+            # 一次性查询所有选中PDF的解析结果（按用户过滤），再按PDF分组，避免逐个PDF查询
+            results_by_pdf = defaultdict(list)
+            if preloaded_results is not None:
+                results_by_pdf.update(preloaded_results)
+            elif pdf_list:
                 query = session.query(ParseResult).filter(
-                    ParseResult.pdf_name == pdf_name
+                    ParseResult.pdf_name.in_(pdf_list)
                 )
                 if user_id is not None:
                     query = query.filter(ParseResult.user_id == user_id)
-                results = query.all()
-                
-                # 构建参数值映射（使用标准参数名作为key）
-                param_values = {}
-                opn = '-'
-                manufacturer = '-'
-                
-                # 即使没有解析结果，也继续处理（会生成一行空数据）
-                for r in results:
-                    if r.param_name:
-                        # 参数值：只保留纯数值+单位，测试条件不拼接
-                        value = r.param_value or '-'
-                        
-                        # 尝试匹配到标准参数名
-                        matched_name = None
-                        
-                        # 1. 精确匹配
-                        if r.param_name in param_name_map:
-                            matched_name = param_name_map[r.param_name]
-                        else:
-                            # 2. 标准化后匹配
-                            normalized_name = r.param_name.lower().replace(' ', '').replace('_', '').replace('-', '')
-                            if normalized_name in param_name_map:
-                                matched_name = param_name_map[normalized_name]
-                        
-                        if matched_name:
-                            # 用 YAML 列名作为 key，便于与 param_names 对齐（如 gfs_IGBT -> gfs）
-                            store_key = db_to_column.get(matched_name, matched_name)
-                            if store_key in param_names:
-                                param_values[store_key] = value
-                            else:
-                                param_values[matched_name] = value
-                        else:
-                            param_values[r.param_name] = value
-                    
-                    # 提取型号和厂家
-                    if r.opn:
-                        opn = r.opn
-                    if r.manufacturer:
-                        manufacturer = r.manufacturer
-                
-                # 构建行数据（所有列都从参数库获取）
-                row = {}
-                
-                # 从解析结果中获取更多基本信息
-                device_type = '-'
-                package = '-'
-                for r in results:
-                    if r.device_type:
-                        device_type = r.device_type
-                    # 尝试获取封装信息
-                    if r.param_name and '封装' in r.param_name and r.param_value:
-                        package = r.param_value
-                
-                # 填充各参数列
-                for param_name in param_names:
-                    if param_name in ('PDF文件名', '文件名'):
-                        row[param_name] = pdf_name
-                    elif param_name == '厂家':
-                        # 优先使用解析结果中的厂家
-                        row[param_name] = manufacturer if manufacturer != '-' else param_values.get(param_name, '-')
-                    elif param_name == 'OPN':
-                        # 优先使用解析结果中的OPN
-                        row[param_name] = opn if opn != '-' else param_values.get(param_name, '-')
-                    elif param_name == '技术':
-                        # 技术类型可以从device_type推断
-                        row[param_name] = param_values.get(param_name, device_type if device_type != '-' else '-')
-                    elif param_name == '封装' or param_name == '厂家封装名':
-                        row[param_name] = param_values.get(param_name, package if package != '-' else '-')
-                    else:
-                        row[param_name] = param_values.get(param_name, '-')
-                
-                table_data.append(row)
+                for r in query.order_by(ParseResult.id).all():
+                    results_by_pdf[r.pdf_name].append(r)
+            
+            param_name_set = set(param_names)
+            table_data = [
+                self._build_table_row(pdf_name, results_by_pdf.get(pdf_name, []),
+                                      param_name_map, param_names, param_name_set)
+                for pdf_name in pdf_list
+            ]
             
             # 构建表头（完全按照参数库顺序，与Excel一致）
             headers = param_names
@@ -1383,19 +1518,24 @@ class DatabaseManager:
         """
         session = self.get_session()
         try:
-            # 获取所有标准参数
-            all_params = session.query(StandardParam).all()
-            standard_names = {p.param_name for p in all_params}
+            # 获取所有标准参数（只取需要的列，避免ORM对象构建）
+            id_to_name = dict(session.query(StandardParam.id, StandardParam.param_name).all())
+            standard_names = set(id_to_name.values())
             
-            # 构建变体名到标准名的映射
+            # 构建变体名到标准名的映射（一次查询全部变体）
             variant_to_standard = {}
-            for p in all_params:
-                variants = session.query(ParamVariant).filter_by(param_id=p.id).all()
-                for v in variants:
-                    variant_to_standard[v.variant_name] = p.param_name
+            for variant_name, param_id in session.query(ParamVariant.variant_name, ParamVariant.param_id).all():
+                if param_id in id_to_name:
+                    variant_to_standard[variant_name] = id_to_name[param_id]
+            
+            # 标准化名称 -> 标准名（用于模糊匹配）
+            normalized_to_standard = {}
+            for std_name in standard_names:
+                std_normalized = std_name.lower().replace(' ', '').replace('_', '').replace('-', '')
+                normalized_to_standard.setdefault(std_normalized, std_name)
             
             # 获取该PDF的解析结果
-            results = session.query(ParseResult).filter(
+            results = session.query(ParseResult.param_name, ParseResult.param_value).filter(
                 ParseResult.pdf_name == pdf_name,
                 ParseResult.is_success == True
             ).all()
@@ -1404,42 +1544,37 @@ class DatabaseManager:
             variant_matched = []  # 通过变体匹配的参数
             unmatched = []  # 未匹配的参数
             
-            for r in results:
-                if r.param_name:
-                    if r.param_name in standard_names:
+            for param_name, param_value in results:
+                if param_name:
+                    if param_name in standard_names:
                         matched.append({
-                            'stored_name': r.param_name,
-                            'value': r.param_value,
+                            'stored_name': param_name,
+                            'value': param_value,
                             'match_type': '精确匹配'
                         })
-                    elif r.param_name in variant_to_standard:
+                    elif param_name in variant_to_standard:
                         variant_matched.append({
-                            'stored_name': r.param_name,
-                            'standard_name': variant_to_standard[r.param_name],
-                            'value': r.param_value,
+                            'stored_name': param_name,
+                            'standard_name': variant_to_standard[param_name],
+                            'value': param_value,
                             'match_type': '变体匹配'
                         })
                     else:
                         # 尝试模糊匹配
-                        normalized = r.param_name.lower().replace(' ', '').replace('_', '').replace('-', '')
-                        fuzzy_match = None
-                        for std_name in standard_names:
-                            std_normalized = std_name.lower().replace(' ', '').replace('_', '').replace('-', '')
-                            if normalized == std_normalized:
-                                fuzzy_match = std_name
-                                break
+                        normalized = param_name.lower().replace(' ', '').replace('_', '').replace('-', '')
+                        fuzzy_match = normalized_to_standard.get(normalized)
                         
                         if fuzzy_match:
                             variant_matched.append({
-                                'stored_name': r.param_name,
+                                'stored_name': param_name,
                                 'standard_name': fuzzy_match,
-                                'value': r.param_value,
+                                'value': param_value,
                                 'match_type': '模糊匹配'
                             })
                         else:
                             unmatched.append({
-                                'stored_name': r.param_name,
-                                'value': r.param_value,
+                                'stored_name': param_name,
+                                'value': param_value,
                                 'match_type': '未匹配'
                             })
             
@@ -1480,15 +1615,54 @@ class DatabaseManager:
                 return None
         return None
 
+    def _get_standard_param_info(self, session: Session) -> Dict[str, Tuple[str, str, str]]:
+        """
+        获取标准参数的 (单位, 英文名, 分类) 映射（带TTL缓存，跨用户复用）
+        """
+        now = time.time()
+        cached = self._std_param_info_cache
+        if cached is not None and now < cached[0]:
+            return cached[1]
+        
+        rows = session.query(
+            StandardParam.param_name,
+            StandardParam.unit,
+            StandardParam.param_name_en,
+            StandardParam.category
+        ).all()
+        info = {name: (unit or '', name_en or '', category or '') for name, unit, name_en, category in rows}
+        self._std_param_info_cache = (now + STANDARD_PARAMS_CACHE_TTL, info)
+        return info
+
+    def _get_standard_param_order(self, session: Session) -> Dict[str, int]:
+        """
+        获取标准参数名 -> 顺序序号 的映射
+        以 (max(id), count(id)) 一条标量查询作版本号，其他实例/进程增删标准参数后自动重建；
+        本进程内修改标准参数时直接失效
+        """
+        version = tuple(session.query(func.max(StandardParam.id), func.count(StandardParam.id)).one())
+        cached = _STD_ORDER_CACHES.get(self._db_url)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        names = session.query(StandardParam.param_name).order_by(StandardParam.id).all()
+        std_order = {name: idx for idx, (name,) in enumerate(names)}
+        _STD_ORDER_CACHES[self._db_url] = (version, std_order)
+        return std_order
+
     def get_available_filter_params(self, user_id: int = None) -> List[Dict[str, Any]]:
         """
         获取当前用户已提取过的、可用于数值筛选的参数列表。
         返回参数名、英文名、单位，供前端选择器使用。
+        结果按 user_id 缓存 FILTER_PARAMS_CACHE_TTL 秒，写入/删除解析结果时失效。
         """
+        now = time.time()
+        cached = self._filter_params_cache.get(user_id)
+        if cached is not None and now < cached[0]:
+            return [dict(item) for item in cached[1]]
+
         session = self.get_session()
         try:
-            from sqlalchemy import func, distinct
-
             # 查询该用户已提取的不重复参数名
             query = session.query(
                 ParseResult.param_name
@@ -1503,34 +1677,26 @@ class DatabaseManager:
 
             param_names = [row[0] for row in query.distinct().all() if row[0]]
 
-            # 跳过基本信息类参数（非数值型）
-            skip_params = {'PDF文件名', '厂家', 'OPN', '厂家封装名', '技术', '封装',
-                           '特殊功能', '极性', 'Product Status', '认证', '安装', 'ESD',
-                           '预算价格€/1k', 'Qg测试条件', 'Ciss测试条件',
-                           '开关时间测试条件', 'Qrr测试条件', 'EAS测试条件', 'IDM限制条件'}
-
             # 查标准参数表获取 unit/英文名
-            all_standard = session.query(StandardParam).all()
-            std_map = {p.param_name: p for p in all_standard}
+            std_info = self._get_standard_param_info(session)
 
             result = []
             for pn in param_names:
-                if pn in skip_params:
+                # 跳过基本信息类参数（非数值型）
+                if pn in _SKIP_FILTER_PARAMS:
                     continue
-                sp = std_map.get(pn)
-                unit = sp.unit if sp else ''
-                param_name_en = sp.param_name_en if sp else ''
-                category = sp.category if sp else ''
+                unit, param_name_en, category = std_info.get(pn, ('', '', ''))
                 result.append({
                     'param_name': pn,
                     'param_name_en': param_name_en,
-                    'unit': unit or '',
-                    'category': category or '',
+                    'unit': unit,
+                    'category': category,
                 })
 
             # 按分类排序，同分类内按参数名排序
             result.sort(key=lambda x: (x['category'], x['param_name']))
-            return result
+            self._filter_params_cache[user_id] = (now + FILTER_PARAMS_CACHE_TTL, result)
+            return [dict(item) for item in result]
         finally:
             session.close()
 
@@ -1635,8 +1801,7 @@ class DatabaseManager:
                 param_columns_set.update(d['params'].keys())
 
             # 按标准参数表的顺序排列
-            all_standard = session.query(StandardParam).all()
-            std_order = {p.param_name: idx for idx, p in enumerate(all_standard)}
+            std_order = self._get_standard_param_order(session)
             param_columns = sorted(
                 param_columns_set,
                 key=lambda x: std_order.get(x, 9999)
@@ -5,11 +5,18 @@
 """
 
 import os
+import stat
+import mmap
+import atexit
+import queue
 import hashlib
+import functools
 import logging
 import pickle
 import sqlite3
 import time
+from collections import OrderedDict
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
@@ -17,6 +24,49 @@ import threading
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C 实现，解析更快
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import blake3  # 可选：SIMD/多线程文件哈希
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import diskcache_rs  # 可选：Rust 实现的磁盘 KV 缓存
+    DISKCACHE_RS_AVAILABLE = True
+except ImportError:
+    DISKCACHE_RS_AVAILABLE = False
+
+try:
+    import lz4.frame  # 可选：缓存文件压缩
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+try:
+    import msgspec  # 可选：纯 dict/list 缓存数据的快速序列化
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson  # 可选：msgspec 不可用时的 JSON 序列化
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# LZ4 frame 格式的魔数，用于区分压缩与未压缩（旧版）缓存文件
+_LZ4_FRAME_MAGIC = b"\x04\x22\x4d\x18"
+
+# 缓存数据序列化格式前缀（旧版文件为无前缀的 pickle，以 0x80 开头）
+_FORMAT_MSGPACK = b"M"
+_FORMAT_JSON = b"J"
+_FORMAT_PICKLE = b"P"
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -25,6 +75,11 @@ logger = logging.getLogger(__name__)
 # 配置管理
 # =====================================================
 
+# 未配置器件类型时使用的默认图标与颜色
+DEFAULT_DEVICE_ICON = '📦'
+DEFAULT_DEVICE_COLOR = '#6B7280'
+
+
 class ConfigManager:
     """
     全局配置管理器
@@ -32,6 +87,8 @@ class ConfigManager:
     """
     _instance = None
     _lock = threading.Lock()
+    # 两次检查配置文件修改时间的最小间隔（秒），避免每次 get 都 stat 一次文件
+    RELOAD_CHECK_INTERVAL = 2.0
     
     def __new__(cls):
         if cls._instance is None:
@@ -47,42 +104,87 @@ class ConfigManager:
         self._initialized = True
         self.config_path = Path(__file__).parent.parent / "config.yaml"
         self._config = {}
+        self._flat: Dict[str, Any] = {}  # 点号路径 -> 值，get 时单次查表
+        self._device_lookup: Dict[str, Tuple[str, str]] = {}  # 器件类型 -> (图标, 颜色)
         self._last_modified = 0
+        self._last_check = 0.0
         self.reload()
     
     def reload(self):
         """重新加载配置文件"""
+        self._last_check = time.monotonic()
         try:
             if self.config_path.exists():
                 current_mtime = self.config_path.stat().st_mtime
                 if current_mtime != self._last_modified:
                     with open(self.config_path, 'r', encoding='utf-8') as f:
-                        self._config = yaml.safe_load(f) or {}
+                        self._config = yaml.load(f, Loader=_YamlLoader) or {}
                     self._last_modified = current_mtime
+                    self._build_index()
                     logger.info("配置文件已重新加载")
         except Exception as e:
             logger.error(f"加载配置文件失败: {e}")
             self._config = {}
+            self._build_index()
+    
+    def _maybe_reload(self):
+        """距上次检查超过 RELOAD_CHECK_INTERVAL 才检查文件是否变更"""
+        if time.monotonic() - self._last_check >= self.RELOAD_CHECK_INTERVAL:
+            self.reload()
+    
+    def _build_index(self):
+        """将嵌套配置展开为 {点号路径: 值}，每一层字典路径都会登记"""
+        flat = {}
+        stack = [('', self._config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f"{prefix}.{key}" if prefix else str(key)
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path, value))
+        self._flat = flat
+        
+        # 器件类型 -> (图标, 颜色)，同名时保留第一项（与原线性查找一致）
+        device_lookup = {}
+        for dt in flat.get('device_types') or []:
+            if isinstance(dt, dict) and dt.get('name') is not None:
+                device_lookup.setdefault(
+                    dt['name'],
+                    (dt.get('icon', DEFAULT_DEVICE_ICON), dt.get('color', DEFAULT_DEVICE_COLOR))
+                )
+        self._device_lookup = device_lookup
+        # 图标/颜色各自独立的映射，预先绑定 dict.get，调用时只做一次哈希查找
+        self._device_icon_get = {name: style[0] for name, style in device_lookup.items()}.get
+        self._device_color_get = {name: style[1] for name, style in device_lookup.items()}.get
     
     def get(self, key_path: str, default=None):
         """
         获取配置值，支持点号分隔的路径
         例如: config.get('ui.primary_color', '#1E3A8A')
         """
-        self.reload()  # 检查并自动重载
-        keys = key_path.split('.')
-        value = self._config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        self._maybe_reload()  # 节流检查并自动重载
+        return self._flat.get(key_path, default)
+    
+    def get_device_style(self, device_type: str) -> Tuple[str, str]:
+        """获取器件类型的 (图标, 颜色)，未配置时返回默认值"""
+        self._maybe_reload()
+        return self._device_lookup.get(device_type, (DEFAULT_DEVICE_ICON, DEFAULT_DEVICE_COLOR))
+    
+    def get_device_icon(self, device_type: str) -> str:
+        """获取器件类型图标，未配置时返回默认图标"""
+        self._maybe_reload()
+        return self._device_icon_get(device_type, DEFAULT_DEVICE_ICON)
+    
+    def get_device_color(self, device_type: str) -> str:
+        """获取器件类型颜色，未配置时返回默认颜色"""
+        self._maybe_reload()
+        return self._device_color_get(device_type, DEFAULT_DEVICE_COLOR)
     
     @property
     def all(self) -> Dict:
         """获取所有配置"""
-        self.reload()
+        self._maybe_reload()
         return self._config.copy()
 
 
@@ -94,33 +196,134 @@ config_manager = ConfigManager()
 # 文件 MD5 与缓存
 # =====================================================
 
-def calculate_file_md5(file_path: str, chunk_size: int = 8192) -> str:
-    """计算文件 MD5，用于缓存键与去重"""
-    h = hashlib.md5()
-    path = Path(file_path)
-    if not path.exists():
-        return ""
+# 分块读取时的缓冲区大小（mmap 不可用时的回退路径）
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _hash_file_into(h, f, chunk_size: int) -> None:
+    """将已打开文件的全部内容喂给哈希对象：优先 mmap 一次性更新，失败时回退到大块读取"""
     try:
-        with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(chunk_size), b""):
-                h.update(chunk)
-        return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            h.update(mm)
+        return
+    except (ValueError, OSError, OverflowError):
+        # 空文件无法 mmap；超大文件在32位进程上可能无法映射
+        f.seek(0)
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        h.update(chunk)
+
+
+@functools.lru_cache(maxsize=4096)
+def _hash_file_cached(resolved_path: str, mtime_ns: int, size: int, chunk_size: int) -> str:
+    """
+    按 (真实路径, 修改时间, 大小) 缓存的文件哈希；文件未变时直接返回上次结果
+    读取失败时抛出异常，不会被缓存
+    """
+    if BLAKE3_AVAILABLE:
+        h = blake3.blake3()
+    else:
+        h = hashlib.blake2b(digest_size=16)
+    with open(resolved_path, "rb") as f:
+        _hash_file_into(h, f, chunk_size)
+    return h.hexdigest()
+
+
+def calculate_file_hash(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    计算文件内容哈希，用于缓存键与去重
+    优先使用 BLAKE3（已安装时），否则回退到 hashlib.blake2b；文件不存在或读取失败返回空串
+    """
+    try:
+        resolved_path = os.path.realpath(file_path)
+        st = os.stat(resolved_path)
+        if not stat.S_ISREG(st.st_mode):
+            return ""
+        return _hash_file_cached(resolved_path, st.st_mtime_ns, st.st_size, chunk_size)
     except Exception:
         return ""
 
 
+def calculate_bytes_hash(data: bytes) -> str:
+    """计算内存中文件内容的哈希，与 calculate_file_hash 结果一致（已读入内存时避免再次读盘）"""
+    if BLAKE3_AVAILABLE:
+        return blake3.blake3(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def calculate_file_md5(file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """兼容旧调用：内部已改用 calculate_file_hash（BLAKE3 / BLAKE2b）"""
+    return calculate_file_hash(file_path, chunk_size)
+
+
+def _cache_key_digest(key: str) -> str:
+    """缓存键 -> 文件名摘要（短键哈希，不用于安全场景）"""
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _is_plain_data(value: Any) -> bool:
+    """判断是否为可无损 msgpack/JSON 往返的纯数据（字符串键字典、列表、标量）"""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if item is None or isinstance(item, (str, bool, int, float)):
+            continue
+        if type(item) is list:
+            stack.extend(item)
+        elif type(item) is dict:
+            for k, v in item.items():
+                if type(k) is not str:
+                    return False
+                stack.append(v)
+        else:
+            return False
+    return True
+
+
+def _serialize_cache_entry(entry: Dict[str, Any]) -> bytes:
+    """序列化缓存条目：纯数据优先用 msgspec/orjson，其余回退到 pickle，均带格式前缀"""
+    if _is_plain_data(entry["value"]):
+        try:
+            if MSGSPEC_AVAILABLE:
+                return _FORMAT_MSGPACK + msgspec.msgpack.encode(entry)
+            if ORJSON_AVAILABLE:
+                return _FORMAT_JSON + orjson.dumps(entry)
+        except (TypeError, OverflowError, ValueError):
+            pass  # 如超出64位的整数，交给 pickle
+    return _FORMAT_PICKLE + pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize_cache_entry(payload: bytes) -> Dict[str, Any]:
+    """按格式前缀反序列化缓存条目（兼容无前缀的旧版 pickle）"""
+    fmt = payload[:1]
+    if fmt == _FORMAT_MSGPACK:
+        return msgspec.msgpack.decode(payload[1:])
+    if fmt == _FORMAT_JSON:
+        return orjson.loads(payload[1:])
+    if fmt == _FORMAT_PICKLE:
+        return pickle.loads(payload[1:])
+    return pickle.loads(payload)
+
+
 def check_pdf_integrity(file_path: str) -> Tuple[bool, str]:
-    """检查 PDF 文件是否可读（存在、非空、可打开）"""
-    path = Path(file_path)
-    if not path.exists():
+    """检查 PDF 文件是否可读（存在、非空、可打开）：一次 stat + 一次读取文件头"""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
         return False, "文件不存在"
-    if not path.is_file():
+    except Exception as e:
+        return False, str(e)
+    if not stat.S_ISREG(st.st_mode):
         return False, "不是文件"
-    if path.stat().st_size == 0:
+    if st.st_size == 0:
         return False, "文件为空"
     try:
-        with open(path, "rb") as f:
-            head = f.read(8)
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            head = os.read(fd, 8)
+        finally:
+            os.close(fd)
         if not head.startswith(b"%PDF"):
             return False, "不是有效的 PDF 格式"
         return True, ""
@@ -129,7 +332,11 @@ def check_pdf_integrity(file_path: str) -> Tuple[bool, str]:
 
 
 class CacheManager:
-    """简单缓存：内存 + 可选文件持久化，支持 TTL（小时）"""
+    """
+    简单缓存：内存 + 磁盘持久化，支持 TTL（小时）
+    磁盘层优先使用 diskcache_rs（已安装且 performance.cache_backend 不为 file 时），
+    否则回退为每个键一个 pickle 文件
+    """
     _instance = None
     _lock = threading.Lock()
 
@@ -145,24 +352,151 @@ class CacheManager:
         if getattr(self, "_initialized", False):
             return
         self._initialized = True
-        self._mem: Dict[str, Tuple[Any, float]] = {}  # key -> (value, expire_ts)
+        # 内存层：LRU，key -> (value, expire_ts)，超过容量淘汰最久未使用的项
+        self._mem: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._mem_lock = threading.Lock()
+        self._mem_maxsize = max(1, config_manager.get("performance.mem_cache_maxsize", 1024))
         self._ttl_hours = max(1, config_manager.get("performance.cache_ttl_hours", 24))
         cache_dir = Path(config_manager.get("paths.cache_dir", "./cache"))
         cache_dir.mkdir(parents=True, exist_ok=True)
         self._cache_dir = cache_dir
+        self._backend = None
+        backend_name = config_manager.get("performance.cache_backend", "auto")
+        if DISKCACHE_RS_AVAILABLE and backend_name != "file":
+            try:
+                self._backend = diskcache_rs.Cache(str(cache_dir / "kv"))
+            except Exception as e:
+                logger.warning(f"diskcache_rs 初始化失败，回退到文件缓存: {e}")
+        # 文件后端已有的缓存文件名（启动时扫描一次），get 未命中时无需逐次 stat
+        self._disk_keys = set()
+        if self._backend is None:
+            self._remove_flat_files()
+            self._disk_keys = {entry.name for entry in self._iter_cache_files()}
+        # 磁盘写入在后台线程中执行，set 只更新内存层后即返回
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
 
     def get(self, key: str) -> Optional[Any]:
         """获取缓存；过期或不存在返回 None"""
-        if key in self._mem:
-            val, expire = self._mem[key]
-            if time.time() < expire:
-                return val
-            del self._mem[key]
-        path = self._cache_dir / f"{hashlib.md5(key.encode()).hexdigest()}.pkl"
-        if path.exists():
+        with self._mem_lock:
+            item = self._mem.get(key)
+            if item is not None:
+                val, expire = item
+                if time.time() < expire:
+                    self._mem.move_to_end(key)
+                    return val
+                del self._mem[key]
+        if self._backend is not None:
+            try:
+                payload = self._backend.get(key)
+                return None if payload is None else pickle.loads(payload)
+            except Exception:
+                return None
+        return self._file_get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存"""
+        ttl_seconds = self._ttl_hours * 3600
+        expire = time.time() + ttl_seconds
+        with self._mem_lock:
+            self._mem[key] = (value, expire)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self._mem_maxsize:
+                self._mem.popitem(last=False)
+        if self._backend is not None:
+            # 在调用线程中序列化，保证落盘的是调用时刻的值（调用方之后可能原地修改该对象）
+            try:
+                payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return
+            self._enqueue_write(self._backend.set, key, payload, expire=ttl_seconds)
+        else:
+            self._file_set(key, value, expire)
+
+    def flush(self) -> None:
+        """阻塞直到所有排队的磁盘写入完成（进程退出时自动调用）"""
+        if self._writer_thread is not None:
+            self._write_queue.join()
+
+    def _enqueue_write(self, func, *args, **kwargs) -> None:
+        """将磁盘写入任务交给后台线程，首次调用时启动线程"""
+        if self._writer_thread is None:
+            with self._writer_lock:
+                if self._writer_thread is None:
+                    thread = threading.Thread(target=self._writer_loop, name="cache-writer", daemon=True)
+                    thread.start()
+                    self._writer_thread = thread
+        self._write_queue.put((func, args, kwargs))
+
+    def _writer_loop(self) -> None:
+        """后台写入线程：依次执行排队的写入任务，单个任务失败不影响后续"""
+        while True:
+            func, args, kwargs = self._write_queue.get()
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logger.debug(f"缓存写入失败: {e}")
+            finally:
+                self._write_queue.task_done()
+
+    def _path_for(self, file_name: str) -> Path:
+        """
+        文件后端：缓存文件按摘要前 2+2 位分两级子目录存放（类似 git objects），
+        避免单个目录下文件过多拖慢 open/stat
+        """
+        return self._cache_dir / file_name[:2] / file_name[2:4] / file_name
+
+    def _iter_cache_files(self):
+        """遍历分片目录下的全部缓存文件（os.DirEntry）"""
+        try:
+            with os.scandir(self._cache_dir) as top:
+                shards = [e.path for e in top if len(e.name) == 2 and e.is_dir()]
+        except OSError:
+            return
+        for shard in shards:
             try:
-                with open(path, "rb") as f:
-                    data = pickle.load(f)
+                with os.scandir(shard) as level2:
+                    subdirs = [e.path for e in level2 if len(e.name) == 2 and e.is_dir()]
+            except OSError:
+                continue
+            for subdir in subdirs:
+                try:
+                    with os.scandir(subdir) as entries:
+                        for entry in entries:
+                            if entry.name.endswith(".pkl") and entry.is_file():
+                                yield entry
+                except OSError:
+                    continue
+
+    def _remove_flat_files(self) -> None:
+        """
+        删除旧版平铺在缓存根目录下的缓存文件
+        旧文件名为 md5(key).pkl，与当前的 _cache_key_digest 不一致，已无法命中
+        """
+        try:
+            with os.scandir(self._cache_dir) as entries:
+                flat_files = [e.path for e in entries if e.name.endswith(".pkl") and e.is_file()]
+        except OSError:
+            return
+        for path in flat_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _file_get(self, key: str) -> Optional[Any]:
+        """文件后端：读取并校验过期时间（兼容未压缩的旧缓存文件）"""
+        file_name = f"{_cache_key_digest(key)}.pkl"
+        if file_name in self._disk_keys:
+            path = self._path_for(file_name)
+            try:
+                payload = path.read_bytes()
+                if payload.startswith(_LZ4_FRAME_MAGIC):
+                    if not LZ4_AVAILABLE:
+                        return None
+                    payload = lz4.frame.decompress(payload)
+                data = _deserialize_cache_entry(payload)
                 expire_ts = data.get("expire_ts", 0)
                 if time.time() < expire_ts:
                     return data.get("value")
@@ -170,50 +504,119 @@ class CacheManager:
                 pass
         return None
 
-    def set(self, key: str, value: Any) -> None:
-        """写入缓存"""
-        expire = time.time() + self._ttl_hours * 3600
-        self._mem[key] = (value, expire)
-        path = self._cache_dir / f"{hashlib.md5(key.encode()).hexdigest()}.pkl"
+    def _file_set(self, key: str, value: Any, expire: float) -> None:
+        """
+        文件后端：在调用线程中序列化（msgspec/orjson/pickle，已安装 lz4 时压缩），
+        保证写入的是调用时刻的值；落盘交给后台线程
+        """
+        file_name = f"{_cache_key_digest(key)}.pkl"
         try:
-            with open(path, "wb") as f:
-                pickle.dump({"value": value, "expire_ts": expire}, f)
+            payload = _serialize_cache_entry({"value": value, "expire_ts": expire})
+            if LZ4_AVAILABLE:
+                payload = lz4.frame.compress(payload)
         except Exception:
-            pass
+            return
+        self._disk_keys.add(file_name)
+        self._enqueue_write(self._write_file, self._path_for(file_name), payload)
+
+    def purge_expired(self) -> int:
+        """
+        清理文件后端中已过期的缓存文件
+        文件修改时间即写入时间，超过 TTL 视为过期；返回删除的文件数
+        """
+        if self._backend is not None:
+            return 0
+        cutoff = time.time() - self._ttl_hours * 3600
+        removed = 0
+        for entry in self._iter_cache_files():
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    self._disk_keys.discard(entry.name)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    @staticmethod
+    def _write_file(path: Path, payload: bytes) -> None:
+        """先写临时文件再替换，避免读取到写了一半的缓存文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
 
 
 cache_manager = CacheManager()
+atexit.register(cache_manager.flush)
 
 
 # =====================================================
 # 数据库优化工具
 # =====================================================
 
-def create_database_indexes(db_path: str):
+# 建索引前设置的 SQLite PRAGMA：WAL 日志、减少 fsync、临时数据放内存、加大页缓存与 mmap
+_SQLITE_INDEX_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+]
+
+
+# 优化索引定义（表不存在时单条失败会被忽略）
+_DATABASE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_pdf_name ON parse_results(pdf_name)",
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_device_type ON parse_results(device_type)",
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_param_id ON parse_results(param_id)",
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_parse_time ON parse_results(parse_time)",
+    "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
+    "CREATE INDEX IF NOT EXISTS idx_table_records_device_type ON table_records(device_type)",
+    # 复合索引：按器件类型筛选参数、按器件类型列出最近解析结果
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_device_type_param_id ON parse_results(device_type, param_id)",
+    "CREATE INDEX IF NOT EXISTS idx_parse_results_device_type_parse_time ON parse_results(device_type, parse_time DESC)",
+)
+
+
+def _create_indexes_on(conn: sqlite3.Connection):
+    """在自行打开的连接上创建索引：设置 PRAGMA 后整体 executescript 一次提交，遇到缺表时退回逐条创建"""
+    for pragma in _SQLITE_INDEX_PRAGMAS:
+        conn.execute(pragma)
+    
+    try:
+        conn.executescript("BEGIN;\n" + ";\n".join(_DATABASE_INDEXES) + ";\nCOMMIT;")
+    except sqlite3.OperationalError:
+        if conn.in_transaction:
+            conn.rollback()
+        _execute_index_statements(conn)
+        conn.commit()
+    
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _execute_index_statements(conn: sqlite3.Connection):
+    """逐条执行建索引语句（表不存在时忽略），不设置 PRAGMA、不提交"""
+    for index_sql in _DATABASE_INDEXES:
+        try:
+            conn.execute(index_sql)
+        except sqlite3.OperationalError:
+            pass  # 表可能不存在，忽略
+
+
+def create_database_indexes(db_path: str, conn: Optional[sqlite3.Connection] = None):
     """
     为数据库创建优化索引
+    - 传入已有的 sqlite3 连接时只在其上执行 CREATE INDEX，不改 PRAGMA、不提交，事务由调用方负责
+    - 否则临时打开连接（设置 PRAGMA、一次提交并 ANALYZE），出错时也保证关闭
     """
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_parse_results_pdf_name ON parse_results(pdf_name)",
-            "CREATE INDEX IF NOT EXISTS idx_parse_results_device_type ON parse_results(device_type)",
-            "CREATE INDEX IF NOT EXISTS idx_parse_results_param_id ON parse_results(param_id)",
-            "CREATE INDEX IF NOT EXISTS idx_parse_results_parse_time ON parse_results(parse_time)",
-            "CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)",
-            "CREATE INDEX IF NOT EXISTS idx_table_records_device_type ON table_records(device_type)",
-        ]
-        
-        for index_sql in indexes:
-            try:
-                cursor.execute(index_sql)
-            except sqlite3.OperationalError:
-                pass  # 表可能不存在，忽略
-        
-        conn.commit()
-        conn.close()
+        if conn is not None:
+            _execute_index_statements(conn)
+        else:
+            with closing(sqlite3.connect(db_path)) as own_conn:
+                _create_indexes_on(own_conn)
         logger.info("数据库索引创建完成")
         
     except Exception as e:
@@ -224,9 +627,26 @@ def create_database_indexes(db_path: str):
 # 日志工具
 # =====================================================
 
+# 文件日志缓冲条数：攒够该数量或出现 ERROR 及以上级别时批量写盘
+LOG_BUFFER_CAPACITY = 512
+
+# 当前生效的日志缓冲处理器（setup_logging 重复调用时替换）
+_buffered_log_handler = None
+
+
+def _flush_log_buffer():
+    """进程退出时刷出当前日志缓冲（模块加载时注册一次）"""
+    if _buffered_log_handler is not None:
+        _buffered_log_handler.flush()
+
+
+atexit.register(_flush_log_buffer)
+
+
 def setup_logging():
     """配置日志系统"""
-    from logging.handlers import RotatingFileHandler
+    global _buffered_log_handler
+    from logging.handlers import RotatingFileHandler, MemoryHandler
     
     log_dir = Path(config_manager.get('paths.log_dir', './logs'))
     log_dir.mkdir(parents=True, exist_ok=True)
@@ -239,8 +659,17 @@ def setup_logging():
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
-    # 清除现有处理器
-    root_logger.handlers.clear()
+    # 清除并关闭现有处理器：MemoryHandler.close 会先刷出缓冲，但不关闭其目标处理器，需单独关闭以释放日志文件句柄
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        target = getattr(handler, 'target', None)
+        for h in (handler, target):
+            if h is None:
+                continue
+            try:
+                h.close()
+            except Exception:
+                pass
     
     # 格式化器
     formatter = logging.Formatter(
@@ -253,16 +682,26 @@ def setup_logging():
     console_handler.setFormatter(formatter)
     root_logger.addHandler(console_handler)
     
-    # 文件处理器
+    # 文件处理器（delay=True：首条日志写入时才打开文件）
     info_handler = RotatingFileHandler(
         log_dir / 'app.log',
         maxBytes=max_size,
         backupCount=3,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     info_handler.setLevel(logging.INFO)
     info_handler.setFormatter(formatter)
-    root_logger.addHandler(info_handler)
+    
+    # 内存缓冲：批量写入文件，ERROR 及以上立即刷出
+    buffered_handler = MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=info_handler
+    )
+    buffered_handler.setLevel(logging.INFO)
+    root_logger.addHandler(buffered_handler)
+    _buffered_log_handler = buffered_handler
     
     logger.info("日志系统初始化完成")
 
@@ -273,20 +712,12 @@ def setup_logging():
 
 def get_device_icon(device_type: str) -> str:
     """获取器件类型图标"""
-    device_types = config_manager.get('device_types', [])
-    for dt in device_types:
-        if dt.get('name') == device_type:
-            return dt.get('icon', '📦')
-    return '📦'
+    return config_manager.get_device_icon(device_type)
 
 
 def get_device_color(device_type: str) -> str:
     """获取器件类型颜色"""
-    device_types = config_manager.get('device_types', [])
-    for dt in device_types:
-        if dt.get('name') == device_type:
-            return dt.get('color', '#6B7280')
-    return '#6B7280'
+    return config_manager.get_device_color(device_type)
 
 
 # =====================================================
@@ -309,6 +740,11 @@ def initialize_optimization():
         path = Path(config_manager.get(f'paths.{path_key}', default))
         path.mkdir(parents=True, exist_ok=True)
     
+    # 清理过期的缓存文件
+    removed = cache_manager.purge_expired()
+    if removed:
+        logger.info(f"已清理 {removed} 个过期缓存文件")
+    
     # 使用与业务一致的数据库路径建索引（与 backend.config.DATABASE_PATH 一致）
     try:
         from backend.config import DATABASE_PATH
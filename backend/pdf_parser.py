@@ -1,24 +1,217 @@
 # -*- coding: utf-8 -*-
 """
 PDF解析模块
-使用pdfplumber精准提取表格/文本，PyMuPDF作为备用提取图片/乱码PDF
+默认使用PyMuPDF快速提取文本/表格，未提取到表格或文本过少时回退pdfplumber精准提取
+（parser.prefer_pymupdf=False 时恢复 pdfplumber 优先）
 """
 
+import io
 import os
 import re
+import functools
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from dataclasses import dataclass, field
-from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pdfplumber
 import fitz  # PyMuPDF
 
+try:
+    import ahocorasick  # 可选：Aho-Corasick 多模式匹配，一次扫描匹配全部厂家关键词
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from .config import config
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 单元格清理正则（模块加载时预编译，避免逐单元格重复解析）
+_CELL_SYMBOL_RE = re.compile(r'([QCVIR])\s*\n\s*([a-zA-Z]+)')  # "Q\noss" → "Qoss"
+_CELL_WORD_RE = re.compile(r'([a-zA-Z]+)\s*\n\s*([a-zA-Z]+)')
+_CELL_WS_RE = re.compile(r'[ \t]+')
+
+@functools.lru_cache(maxsize=8192)
+def _clean_cell(cell_text: str) -> str:
+    """
+    清理单元格内容；表格中大量重复的单元格（单位、符号、空值等）直接命中缓存
+    只有包含换行/制表符/连续空格时才需要正则处理
+    """
+    cell_text = cell_text.strip()
+    
+    # 【优化】处理符号中的换行符，如 "Q\noss" → "Qoss", "C\niss" → "Ciss"
+    # 常见参数符号模式
+    if '\n' in cell_text:
+        cell_text = _CELL_SYMBOL_RE.sub(r'\1\2', cell_text)
+        cell_text = _CELL_WORD_RE.sub(r'\1\2', cell_text)
+    
+    # 【优化】处理下标格式，如 "Qoss" 保持不变
+    # 替换多余的空白字符（但保留换行符用于多值识别）
+    if '\t' in cell_text or '  ' in cell_text:
+        cell_text = _CELL_WS_RE.sub(' ', cell_text)
+    
+    return cell_text
+
+
+# 首页产品摘要 / 型号正则
+_SUMMARY_VDS_RE = re.compile(r'V[D]?[S]?[S]?\s*[=:]?\s*(\d+)\s*V', re.IGNORECASE)
+_SUMMARY_RDSON_RE = re.compile(
+    r'R[D]?[S]?\(on\)[.,]?\s*(?:typ|max)?\s*[@=]?\s*V[G]?S\s*=\s*(\d+)\s*V\s*[=:]?\s*([\d.]+)\s*m?Ω',
+    re.IGNORECASE
+)
+_SUMMARY_ID_RE = re.compile(r'I[D]?\s*[=:]?\s*(\d+)\s*A', re.IGNORECASE)
+_OPN_RE = re.compile(r'([A-Z]{2,}[\d]+[A-Z\d]*)')
+
+# 器件类型识别正则
+# 器件类型关键词合并为一个正则，一次扫描得到全部命中的关键词类别（按分组编号区分）
+_DEVICE_KEYWORD_RE = re.compile(r'(\bsic\b|silicon carbide)|(igbt)|(super junction)')
+_KW_SIC, _KW_IGBT, _KW_SUPER_JUNCTION = 1, 2, 3
+_IGBT_OPN_RE = re.compile(r'SRE\d+N')
+_SRC_OPN_RE = re.compile(r'SRC\d+R|SRC\d+[A-Z]')
+
+# 厂家网址（按优先级排列，优先从网址识别）
+_VENDOR_URLS = [
+    ('lonten.cc', 'Lonten'),
+    ('infineon.com', 'Infineon'),
+    ('toshiba.com', 'Toshiba'),
+    ('toshiba.co.jp', 'Toshiba'),
+    ('onsemi.com', 'ON Semiconductor'),
+    ('st.com', 'STMicroelectronics'),
+    ('nxp.com', 'NXP'),
+    ('vishay.com', 'Vishay'),
+    ('rohm.com', 'ROHM'),
+    ('rohm.co.jp', 'ROHM'),
+    ('renesas.com', 'Renesas'),
+    ('ti.com', 'Texas Instruments'),
+    ('diodes.com', 'Diodes Inc'),
+]
+
+# 厂家关键词（网址未匹配时使用）
+_VENDOR_KEYWORDS = {
+    'infineon': 'Infineon',
+    'toshiba': 'Toshiba',
+    'on semiconductor': 'ON Semiconductor',
+    'onsemi': 'ON Semiconductor',
+    'stmicroelectronics': 'STMicroelectronics',
+    'nxp semiconductors': 'NXP',
+    'lonten': 'Lonten',
+    'kuaijiexin': 'KUAIJIEXIN',
+    '快捷芯': 'KUAIJIEXIN',
+    'vishay': 'Vishay',
+    'rohm': 'ROHM',
+    'renesas': 'Renesas',
+}
+
+
+def _build_vendor_automaton(entries: List[Tuple[str, str]]):
+    """构建 关键词 -> (优先级, 厂家) 的自动机；同一关键词保留优先级最高的一项"""
+    automaton = ahocorasick.Automaton()
+    for priority, (keyword, vendor_name) in enumerate(entries):
+        if keyword not in automaton:
+            automaton.add_word(keyword, (priority, vendor_name))
+    automaton.make_automaton()
+    return automaton
+
+
+if AHOCORASICK_AVAILABLE:
+    _VENDOR_URL_AUTOMATON = _build_vendor_automaton(_VENDOR_URLS)
+    _VENDOR_KEYWORD_AUTOMATON = _build_vendor_automaton(list(_VENDOR_KEYWORDS.items()))
+
+
+def _match_vendor(text_lower: str) -> Optional[str]:
+    """
+    识别厂家：先匹配网址，再匹配关键词；同一阶段命中多个时按列表优先级取第一个
+    已安装 pyahocorasick 时每个阶段只扫描一遍文本
+    """
+    if AHOCORASICK_AVAILABLE:
+        for automaton in (_VENDOR_URL_AUTOMATON, _VENDOR_KEYWORD_AUTOMATON):
+            best = min((value for _, value in automaton.iter(text_lower)), default=None)
+            if best is not None:
+                return best[1]
+        return None
+    
+    for keyword, vendor_name in _VENDOR_URLS:
+        if keyword in text_lower:
+            return vendor_name
+    for keyword, vendor_name in _VENDOR_KEYWORDS.items():
+        if keyword in text_lower:
+            return vendor_name
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_product_summary_cached(text: str) -> Dict[str, str]:
+    """从首页开头文本提取产品摘要（纯函数，可缓存；调用方需复制返回的字典）"""
+    summary = {}
+    
+    # 提取VDS/VDSS
+    vds_match = _SUMMARY_VDS_RE.search(text)
+    if vds_match:
+        summary['VDSS'] = vds_match.group(1) + 'V'
+    
+    # 提取RDS(on)
+    rds_match = _SUMMARY_RDSON_RE.search(text)
+    if rds_match:
+        summary['RDS(on)'] = rds_match.group(2) + 'mΩ'
+    
+    # 提取ID
+    id_match = _SUMMARY_ID_RE.search(text)
+    if id_match:
+        summary['ID'] = id_match.group(1) + 'A'
+    
+    return summary
+
+
+@functools.lru_cache(maxsize=1024)
+def _extract_metadata_cached(head: str, vendor_tail: str, file_name: str) -> Dict[str, Any]:
+    """
+    提取器件型号、器件类型、厂家（纯函数，可缓存；调用方需复制返回的字典）
+    head 为首页开头文本，vendor_tail 为识别厂家时额外扫描的末尾文本
+    """
+    metadata = {}
+    
+    # 提取器件型号（通常是首行或显著位置的型号）
+    opn_match = _OPN_RE.search(head, 0, 500)
+    opn = opn_match.group(1) if opn_match else ''
+    if opn:
+        metadata['opn'] = opn
+    
+    head_lower = head.lower()
+    
+    # 器件类型识别：型号规则 + 关键词，Super Junction 回退为 Si
+    # 注意：用 \bsic\b 单词边界匹配，避免 "intrinsic"/"basic" 等误触发
+    search_str = f"{opn} {file_name}".upper()
+    found = {m.lastindex for m in _DEVICE_KEYWORD_RE.finditer(head_lower)}
+    has_sic_keyword = _KW_SIC in found
+    is_super_junction = _KW_SUPER_JUNCTION in found
+    if _IGBT_OPN_RE.search(search_str):
+        metadata['device_type'] = 'IGBT'
+    elif 'SRFIM' in search_str:
+        metadata['device_type'] = 'SiC MOSFET'
+    elif _SRC_OPN_RE.search(search_str):
+        # SRC 系列既有 SiC 也有 Si Super Junction；用文本关键词二次确认
+        if is_super_junction and not has_sic_keyword:
+            metadata['device_type'] = 'Si MOSFET'
+        else:
+            metadata['device_type'] = 'SiC MOSFET'
+    elif has_sic_keyword:
+        metadata['device_type'] = 'SiC MOSFET'
+    elif _KW_IGBT in found:
+        metadata['device_type'] = 'IGBT'
+    else:
+        # 含 mosfet 关键词或无法判断时均按 Si MOSFET 处理
+        metadata['device_type'] = 'Si MOSFET'
+    
+    # 识别厂家 - 优先从网址识别（最准确），网址没匹配到再用关键词匹配
+    manufacturer = _match_vendor(head_lower + vendor_tail.lower())
+    if manufacturer:
+        metadata['manufacturer'] = manufacturer
+    
+    return metadata
+
 
 @dataclass
 class ExtractedTable:
@@ -49,6 +242,7 @@ class PDFContent:
     product_summary: Dict[str, str] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
     error: str = None
+    file_hash: str = None  # 文件内容哈希（batch_parse 计算过时填入，用作结构化文本缓存键）
 
 
 class PDFParser:
@@ -59,6 +253,7 @@ class PDFParser:
     
     # 常见表头关键词
     TABLE_HEADERS = ['Parameter', 'Symbol', 'Value', 'Min', 'Max', 'Typ', 'Unit', 'Test Condition', 'Conditions']
+    _TABLE_HEADERS_LOWER = tuple(keyword.lower() for keyword in TABLE_HEADERS)
     
     # 需要过滤的页眉页脚关键词
     # 注意：保留网址信息（用于AI识别厂家），只过滤纯页码等无用信息
@@ -70,23 +265,57 @@ class PDFParser:
         r'^All rights reserved',
         r'^Confidential',
     ]
+    # PyMuPDF 正文块使用的过滤模式：不含纯数字行规则，表格中的数值行不会被当成页码删掉
+    # （页码已由页眉/页脚区域的过滤去除）
+    BODY_FILTER_PATTERNS = [p for p in FILTER_PATTERNS if p != r'^\d+$']
+    # 合并为单个交替正则，每行只需匹配一次（页眉/页脚区域用全部模式，正文用正文模式）
+    _FILTER_RE = re.compile('|'.join(f'(?:{p})' for p in FILTER_PATTERNS), re.IGNORECASE)
+    _BODY_FILTER_RE = re.compile('|'.join(f'(?:{p})' for p in BODY_FILTER_PATTERNS), re.IGNORECASE)
+    # 整段文本版本（MULTILINE，全部模式，pdfplumber 没有坐标区域可用）：行首锚定的模式只在行首尝试，
+    # 其余模式在行内查找；\s 换成不含换行的空白，保证每个模式只在单行内匹配，命中的行连同换行符一起删除
+    _FILTER_LINES_RE = re.compile(
+        r'^(?:' + '|'.join(
+            (p[1:] if p.startswith('^') else r'[^\n]*?' + p).replace(r'\s', r'[^\S\n]')
+            for p in sorted(FILTER_PATTERNS, key=lambda p: not p.startswith('^'))
+        ) + r')[^\n]*(?:\n|\Z)',
+        re.IGNORECASE | re.MULTILINE
+    )
+    
+    # 平均每页文本少于该字符数时视为提取不充分（扫描件/乱码），回退到另一解析器
+    MIN_TEXT_PER_PAGE = 50
+    
+    # batch_parse 的 I/O 预取线程数
+    PREFETCH_WORKERS = 4
+    
+    # 每个分片任务至少包含的页数（页数过少时进程间通信开销大于收益）
+    MIN_PAGES_PER_TASK = 4
+    
+    # 首页摘要/元数据只扫描开头部分（型号、器件类型、摘要参数都在标题区域）；
+    # 厂家网址常位于页脚，因此识别厂家时额外扫描末尾部分
+    METADATA_HEAD_CHARS = 4096
+    METADATA_TAIL_CHARS = 1024
+    
+    # 页眉/页脚区域占页面高度的比例（PyMuPDF按文本块坐标判断）
+    HEADER_BAND_RATIO = 0.06
+    FOOTER_BAND_RATIO = 0.94
     
     def __init__(self):
         self.timeout = config.parser.pdf_timeout
     
-    def parse_pdf(self, pdf_path: str) -> PDFContent:
+    def parse_pdf(self, pdf_path: str, data: Optional[bytes] = None) -> PDFContent:
         """
         解析单个PDF文件
         
         Args:
             pdf_path: PDF文件路径
+            data: 已读入内存的文件内容（可选，传入时不再重复读盘）
             
         Returns:
             PDFContent对象，包含提取的文本和表格
         """
         pdf_path = Path(pdf_path)
         
-        if not pdf_path.exists():
+        if data is None and not pdf_path.exists():
             return PDFContent(
                 file_path=str(pdf_path),
                 file_name=pdf_path.name,
@@ -95,13 +324,23 @@ class PDFParser:
             )
         
         try:
+            if getattr(config.parser, 'prefer_pymupdf', True):
+                # 优先使用PyMuPDF（速度快），提取不充分时再用pdfplumber
+                content = self._parse_with_pymupdf(pdf_path, data)
+                if content.error or self._needs_pdfplumber(content):
+                    logger.info(f"PyMuPDF提取不充分，尝试pdfplumber: {pdf_path.name}")
+                    fallback = self._parse_with_pdfplumber(pdf_path, data)
+                    if self._is_better_content(fallback, content):
+                        content = fallback
+                return content
+            
             # 优先使用pdfplumber
-            content = self._parse_with_pdfplumber(pdf_path)
+            content = self._parse_with_pdfplumber(pdf_path, data)
             
             # 如果pdfplumber提取失败或内容过少，尝试PyMuPDF
             if content.error or (not content.tables and not content.texts):
                 logger.warning(f"pdfplumber提取失败，尝试PyMuPDF: {pdf_path.name}")
-                content = self._parse_with_pymupdf(pdf_path)
+                content = self._parse_with_pymupdf(pdf_path, data)
             
             return content
             
@@ -114,8 +353,30 @@ class PDFParser:
                 error=str(e)
             )
     
-    def _parse_with_pdfplumber(self, pdf_path: Path) -> PDFContent:
-        """使用pdfplumber解析PDF"""
+    def _needs_pdfplumber(self, content: PDFContent) -> bool:
+        """PyMuPDF结果是否需要pdfplumber补充：有页面但没有表格，或平均每页文本过少"""
+        if content.page_count <= 0:
+            return False
+        if not content.tables:
+            return True
+        total_chars = sum(len(t.text) for t in content.texts)
+        return total_chars / content.page_count < self.MIN_TEXT_PER_PAGE
+    
+    @staticmethod
+    def _is_better_content(candidate: PDFContent, current: PDFContent) -> bool:
+        """比较两个解析结果：无错误优先，其次表格更多，再次文本更多"""
+        if candidate.error:
+            return False
+        if current.error:
+            return bool(candidate.tables or candidate.texts)
+        
+        def score(c: PDFContent):
+            return (len(c.tables), sum(len(t.text) for t in c.texts))
+        
+        return score(candidate) > score(current)
+    
+    def _parse_with_pdfplumber(self, pdf_path: Path, data: Optional[bytes] = None) -> PDFContent:
+        """使用pdfplumber解析PDF（data 不为空时直接从内存解析）"""
         content = PDFContent(
             file_path=str(pdf_path),
             file_name=pdf_path.name,
@@ -123,9 +384,10 @@ class PDFParser:
         )
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with pdfplumber.open(io.BytesIO(data) if data is not None else pdf_path) as pdf:
                 content.page_count = len(pdf.pages)
                 
+                prev_page_has_tables = False
                 for page_num, page in enumerate(pdf.pages):
                     # 提取文本
                     text = page.extract_text()
@@ -143,8 +405,13 @@ class PDFParser:
                         
                         content.texts.append(extracted_text)
                     
-                    # 提取表格
+                    # 提取表格（最耗时的步骤）：只处理含表头关键词的页面，
+                    # 以及紧跟在表格页之后的页面（跨页续表没有表头）
+                    text_lower = text.lower() if text else ''
+                    if not prev_page_has_tables and not any(k in text_lower for k in self._TABLE_HEADERS_LOWER):
+                        continue
                     tables = page.extract_tables()
+                    prev_page_has_tables = bool(tables)
                     for table_idx, table in enumerate(tables):
                         if table and len(table) > 1:
                             extracted_table = self._process_table(table, page_num + 1, table_idx)
@@ -157,8 +424,16 @@ class PDFParser:
             content.error = str(e)
             return content
     
-    def _parse_with_pymupdf(self, pdf_path: Path) -> PDFContent:
-        """使用PyMuPDF解析PDF（备用方案）"""
+    def _parse_with_pymupdf(self, pdf_path: Path, data: Optional[bytes] = None) -> PDFContent:
+        """使用PyMuPDF解析PDF（默认首选方案，data 不为空时直接从内存解析）"""
+        return self._parse_pymupdf_pages(pdf_path, data=data)
+    
+    def _parse_pymupdf_pages(self, pdf_path: Path, start: int = 0, stop: Optional[int] = None,
+                             data: Optional[bytes] = None) -> PDFContent:
+        """
+        使用PyMuPDF解析PDF的 [start, stop) 页（stop 为 None 表示到末页）
+        page_count 始终为整份文档页数；仅当包含首页时提取产品摘要与元数据
+        """
         content = PDFContent(
             file_path=str(pdf_path),
             file_name=pdf_path.name,
@@ -166,40 +441,45 @@ class PDFParser:
         )
         
         try:
-            doc = fitz.open(pdf_path)
-            content.page_count = len(doc)
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+            # 指定 filetype 跳过格式探测；with 保证异常时也关闭文档
+            if data is not None:
+                doc = fitz.open(stream=data, filetype="pdf")
+            else:
+                doc = fitz.open(pdf_path, filetype="pdf")
+            with doc:
+                content.page_count = len(doc)
+                if stop is None or stop > len(doc):
+                    stop = len(doc)
                 
-                # 提取文本
-                text = page.get_text()
-                if text:
-                    cleaned_text = self._clean_text(text)
-                    extracted_text = ExtractedText(
-                        page_num=page_num + 1,
-                        text=cleaned_text
-                    )
+                # 直接迭代页面对象，避免逐页下标查找
+                for page_num, page in enumerate(doc.pages(start, stop), start):
+                    # 提取文本：按文本块坐标区分页眉页脚与正文
+                    blocks = page.get_text("blocks")
+                    if blocks:
+                        cleaned_text = self._clean_blocks(blocks, page.rect.height)
+                        extracted_text = ExtractedText(
+                            page_num=page_num + 1,
+                            text=cleaned_text
+                        )
                     
-                    if page_num == 0:
-                        content.product_summary = self._extract_product_summary(cleaned_text)
-                        content.metadata = self._extract_metadata(cleaned_text, file_name=str(pdf_path.name))
+                        if page_num == 0:
+                            content.product_summary = self._extract_product_summary(cleaned_text)
+                            content.metadata = self._extract_metadata(cleaned_text, file_name=str(pdf_path.name))
                     
-                    content.texts.append(extracted_text)
-                
-                # PyMuPDF的表格提取
-                try:
-                    tabs = page.find_tables()
-                    for table_idx, tab in enumerate(tabs):
-                        table_data = tab.extract()
-                        if table_data and len(table_data) > 1:
-                            extracted_table = self._process_table(table_data, page_num + 1, table_idx)
-                            if extracted_table:
-                                content.tables.append(extracted_table)
-                except Exception as e:
-                    logger.warning(f"PyMuPDF表格提取失败: {e}")
+                        content.texts.append(extracted_text)
+                    
+                    # PyMuPDF的表格提取
+                    try:
+                        tabs = page.find_tables()
+                        for table_idx, tab in enumerate(tabs):
+                            table_data = tab.extract()
+                            if table_data and len(table_data) > 1:
+                                extracted_table = self._process_table(table_data, page_num + 1, table_idx)
+                                if extracted_table:
+                                    content.tables.append(extracted_table)
+                    except Exception as e:
+                        logger.warning(f"PyMuPDF表格提取失败: {e}")
             
-            doc.close()
             return content
             
         except Exception as e:
@@ -211,24 +491,30 @@ class PDFParser:
         if not text:
             return ""
         
-        lines = text.split('\n')
+        # 去除每行首尾空白并丢弃空行，再用一次多行正则删除匹配过滤模式的行
+        text = '\n'.join([line for line in map(str.strip, text.split('\n')) if line])
+        return self._FILTER_LINES_RE.sub('', text).rstrip('\n')
+    
+    def _clean_blocks(self, blocks: List[tuple], page_height: float) -> str:
+        """
+        清理PyMuPDF文本块 (x0, y0, x1, y1, text, block_no, block_type)
+        页眉/页脚区域的文本块按全部过滤模式逐行匹配（保留其中的网址等信息），
+        正文块按正文过滤模式匹配（页码已在页眉/页脚区域去除，保留正文中的纯数字行）
+        """
+        header_limit = page_height * self.HEADER_BAND_RATIO
+        footer_limit = page_height * self.FOOTER_BAND_RATIO
         cleaned_lines = []
         
-        for line in lines:
-            line = line.strip()
-            
-            # 跳过空行
-            if not line:
-                continue
-            
-            # 跳过匹配过滤模式的行
-            should_filter = False
-            for pattern in self.FILTER_PATTERNS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    should_filter = True
-                    break
-            
-            if not should_filter:
+        for x0, y0, x1, y1, text, _block_no, block_type in blocks:
+            if block_type != 0 or not text:
+                continue  # 图片块
+            in_band = y0 < header_limit or y1 > footer_limit
+            for line in text.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                if (self._FILTER_RE if in_band else self._BODY_FILTER_RE).search(line):
+                    continue
                 cleaned_lines.append(line)
         
         return '\n'.join(cleaned_lines)
@@ -248,28 +534,11 @@ class PDFParser:
         if not table or len(table) < 2:
             return None
         
-        # 清理表格数据
-        cleaned_table = []
-        for row in table:
-            cleaned_row = []
-            for cell in row:
-                if cell is None:
-                    cleaned_row.append('')
-                else:
-                    # 清理单元格内容
-                    cell_text = str(cell).strip()
-                    
-                    # 【优化】处理符号中的换行符，如 "Q\noss" → "Qoss", "C\niss" → "Ciss"
-                    # 常见参数符号模式
-                    cell_text = re.sub(r'([QCVIR])\s*\n\s*([a-zA-Z]+)', r'\1\2', cell_text)
-                    cell_text = re.sub(r'([a-zA-Z]+)\s*\n\s*([a-zA-Z]+)', r'\1\2', cell_text)
-                    
-                    # 【优化】处理下标格式，如 "Qoss" 保持不变
-                    # 替换多余的空白字符（但保留换行符用于多值识别）
-                    cell_text = re.sub(r'[ \t]+', ' ', cell_text)
-                    
-                    cleaned_row.append(cell_text)
-            cleaned_table.append(cleaned_row)
+        # 清理表格数据（None → ''，其余按单元格文本清理，重复内容直接复用结果）
+        cleaned_table = [
+            [_clean_cell(str(cell)) if cell is not None else '' for cell in row]
+            for row in table
+        ]
         
         # 识别表头
         headers = []
@@ -278,7 +547,7 @@ class PDFParser:
         for i, row in enumerate(cleaned_table):
             row_text = ' '.join(row).lower()
             # 检查是否包含表头关键词
-            is_header = any(keyword.lower() in row_text for keyword in self.TABLE_HEADERS)
+            is_header = any(keyword in row_text for keyword in self._TABLE_HEADERS_LOWER)
             if is_header:
                 headers = row
                 data_start_idx = i + 1
@@ -307,106 +576,18 @@ class PDFParser:
         )
     
     def _extract_product_summary(self, text: str) -> Dict[str, str]:
-        """从首页文本提取产品摘要信息"""
-        summary = {}
-        
-        # 提取VDS/VDSS
-        vds_match = re.search(r'V[D]?[S]?[S]?\s*[=:]?\s*(\d+)\s*V', text, re.IGNORECASE)
-        if vds_match:
-            summary['VDSS'] = vds_match.group(1) + 'V'
-        
-        # 提取RDS(on)
-        rds_match = re.search(r'R[D]?[S]?\(on\)[.,]?\s*(?:typ|max)?\s*[@=]?\s*V[G]?S\s*=\s*(\d+)\s*V\s*[=:]?\s*([\d.]+)\s*m?Ω', text, re.IGNORECASE)
-        if rds_match:
-            summary['RDS(on)'] = rds_match.group(2) + 'mΩ'
-        
-        # 提取ID
-        id_match = re.search(r'I[D]?\s*[=:]?\s*(\d+)\s*A', text, re.IGNORECASE)
-        if id_match:
-            summary['ID'] = id_match.group(1) + 'A'
-        
-        return summary
+        """从首页文本提取产品摘要信息（只看开头部分，结果按该部分文本缓存）"""
+        return dict(_extract_product_summary_cached(text[:self.METADATA_HEAD_CHARS]))
     
     def _extract_metadata(self, text: str, file_name: str = '') -> Dict[str, Any]:
-        """提取PDF元数据（器件型号、厂家等）"""
-        metadata = {}
-        
-        # 提取器件型号（通常是首行或显著位置的型号）
-        opn_match = re.search(r'([A-Z]{2,}[\d]+[A-Z\d]*)', text[:500])
-        opn = opn_match.group(1) if opn_match else ''
-        if opn:
-            metadata['opn'] = opn
-        
-        text_lower = (text or '').lower()
-        
-        # 器件类型识别：型号规则 + 关键词，Super Junction 回退为 Si
-        # 注意：用 \bsic\b 单词边界匹配，避免 "intrinsic"/"basic" 等误触发
-        search_str = f"{opn} {file_name}".upper()
-        has_sic_keyword = bool(re.search(r'\bsic\b|silicon carbide', text_lower))
-        is_super_junction = 'super junction' in text_lower
-        if re.search(r'SRE\d+N', search_str):
-            metadata['device_type'] = 'IGBT'
-        elif 'SRFIM' in search_str:
-            metadata['device_type'] = 'SiC MOSFET'
-        elif re.search(r'SRC\d+R|SRC\d+[A-Z]', search_str):
-            # SRC 系列既有 SiC 也有 Si Super Junction；用文本关键词二次确认
-            if is_super_junction and not has_sic_keyword:
-                metadata['device_type'] = 'Si MOSFET'
-            else:
-                metadata['device_type'] = 'SiC MOSFET'
-        elif has_sic_keyword:
-            metadata['device_type'] = 'SiC MOSFET'
-        elif 'igbt' in text_lower:
-            metadata['device_type'] = 'IGBT'
-        elif 'mosfet' in text_lower or 'power mosfet' in text_lower:
-            metadata['device_type'] = 'Si MOSFET'
+        """提取PDF元数据（器件型号、厂家等），结果按实际参与匹配的文本片段缓存"""
+        text = text or ''
+        head = text[:self.METADATA_HEAD_CHARS]
+        if len(text) > self.METADATA_HEAD_CHARS + self.METADATA_TAIL_CHARS:
+            vendor_tail = '\n' + text[-self.METADATA_TAIL_CHARS:]
         else:
-            metadata['device_type'] = 'Si MOSFET'
-        
-        # 识别厂家 - 优先从网址识别（最准确）
-        url_patterns = {
-            r'lonten\.cc': 'Lonten',
-            r'infineon\.com': 'Infineon',
-            r'toshiba\.(com|co\.jp)': 'Toshiba',
-            r'onsemi\.com': 'ON Semiconductor',
-            r'st\.com': 'STMicroelectronics',
-            r'nxp\.com': 'NXP',
-            r'vishay\.com': 'Vishay',
-            r'rohm\.(com|co\.jp)': 'ROHM',
-            r'renesas\.com': 'Renesas',
-            r'ti\.com': 'Texas Instruments',
-            r'diodes\.com': 'Diodes Inc',
-        }
-        
-        # 先从网址匹配
-        for pattern, vendor_name in url_patterns.items():
-            if re.search(pattern, text_lower):
-                metadata['manufacturer'] = vendor_name
-                break
-        
-        # 如果网址没匹配到，再用关键词匹配
-        if 'manufacturer' not in metadata:
-            vendors = {
-                'infineon': 'Infineon',
-                'toshiba': 'Toshiba',
-                'on semiconductor': 'ON Semiconductor',
-                'onsemi': 'ON Semiconductor',
-                'stmicroelectronics': 'STMicroelectronics',
-                'nxp semiconductors': 'NXP',
-                'lonten': 'Lonten',
-                'kuaijiexin': 'KUAIJIEXIN',
-                '快捷芯': 'KUAIJIEXIN',
-                'vishay': 'Vishay',
-                'rohm': 'ROHM',
-                'renesas': 'Renesas',
-            }
-            
-            for keyword, vendor_name in vendors.items():
-                if keyword in text_lower:
-                    metadata['manufacturer'] = vendor_name
-                    break
-        
-        return metadata
+            vendor_tail = text[self.METADATA_HEAD_CHARS:]
+        return dict(_extract_metadata_cached(head, vendor_tail, file_name))
     
     def get_structured_content(self, content: PDFContent, fast_mode: bool = False) -> str:
         """
@@ -419,73 +600,118 @@ class PDFParser:
         Returns:
             结构化的文本字符串
         """
-        output = []
+        buf = io.StringIO()
+        write = buf.write
         
         # 文件信息
-        output.append(f"=== PDF文件: {content.file_name} ===")
-        output.append(f"页数: {content.page_count}")
+        write(f"=== PDF文件: {content.file_name} ===\n")
+        write(f"页数: {content.page_count}\n")
         
         # 产品摘要
         if content.product_summary:
-            output.append("\n=== 产品摘要 ===")
+            write("\n=== 产品摘要 ===\n")
             for key, value in content.product_summary.items():
-                output.append(f"{key}: {value}")
+                write(f"{key}: {value}\n")
         
         # 元数据
         if content.metadata:
-            output.append("\n=== 器件信息 ===")
+            write("\n=== 器件信息 ===\n")
             for key, value in content.metadata.items():
-                output.append(f"{key}: {value}")
+                write(f"{key}: {value}\n")
         
         # 页面文本（全部页面，不截断）
         if content.texts:
             if fast_mode:
-                output.append("\n=== 首页文本 ===")
-                first_page = content.texts[0].text if content.texts else ""
-                output.append(first_page[:2500])
+                write("\n=== 首页文本 ===\n")
+                write(content.texts[0].text[:2500])
+                write("\n")
             else:
-                output.append(f"\n=== 全部文本（共{len(content.texts)}页） ===")
+                write(f"\n=== 全部文本（共{len(content.texts)}页） ===\n")
                 for i, text_obj in enumerate(content.texts):
-                    output.append(f"\n--- 第{i+1}页 ---\n" + text_obj.text)
+                    write(f"\n--- 第{i+1}页 ---\n")
+                    write(text_obj.text)
+                    write("\n")
         
         # 表格数据
         if content.tables:
-            output.append("\n=== 参数表格 ===")
+            write("\n=== 参数表格 ===\n")
+            # 多值单元格的展示结果在本次输出内复用
+            multi_value_cells: Dict[str, str] = {}
             # 快速模式：保留所有表格但限制行数
             for table in content.tables:
-                output.append(f"\n--- 表格 (第{table.page_num}页) ---")
-                # 输出表头
-                output.append("| " + " | ".join(table.headers) + " |")
-                output.append("|" + "|".join(["---"] * len(table.headers)) + "|")
+                write(f"\n--- 表格 (第{table.page_num}页) ---\n")
+                # 输出表头（每个表格只拼接一次）
+                write("| " + " | ".join(table.headers) + " |\n")
+                write("|" + "|".join(["---"] * len(table.headers)) + "|\n")
                 # 快速模式：每个表格限制40行
                 rows_to_process = table.rows[:40] if fast_mode else table.rows
+                # 列数与补齐用的空单元格每个表格只计算一次
+                ncols = len(table.headers)
+                empty_pad = [''] * ncols
                 # 输出数据行
                 for row in rows_to_process:
-                    # 确保行长度与表头一致
-                    padded_row = row + [''] * (len(table.headers) - len(row))
+                    # 确保行长度与表头一致（不足补空，超出截断）
+                    padded_row = row[:ncols] if len(row) >= ncols else (row + empty_pad)[:ncols]
                     # 【优化】处理多值单元格，用分号分隔展示
                     processed_row = []
-                    for cell in padded_row[:len(table.headers)]:
+                    for cell in padded_row:
                         # 如果单元格包含多个换行分隔的值，标注出来
                         if '\n' in cell:
-                            values = [v.strip() for v in cell.split('\n') if v.strip()]
-                            if len(values) > 1:
-                                # 标注多值：第1个值; 第2个值; 第3个值
-                                cell = ' | '.join([f"[{i+1}]{v}" for i, v in enumerate(values)])
+                            shown = multi_value_cells.get(cell)
+                            if shown is None:
+                                shown = cell
+                                values = [v.strip() for v in cell.split('\n') if v.strip()]
+                                if len(values) > 1:
+                                    # 标注多值：第1个值; 第2个值; 第3个值
+                                    shown = ' | '.join([f"[{i+1}]{v}" for i, v in enumerate(values)])
+                                multi_value_cells[cell] = shown
+                            cell = shown
                         processed_row.append(cell)
-                    output.append("| " + " | ".join(processed_row) + " |")
+                    write("| " + " | ".join(processed_row) + " |\n")
         
-        return '\n'.join(output)
+        # 去掉末尾多余的换行
+        return buf.getvalue()[:-1]
+    
+    def get_structured_content_cached(self, content: PDFContent, fast_mode: bool = False,
+                                      file_hash: Optional[str] = None) -> str:
+        """
+        带持久化缓存的 get_structured_content，缓存键为 (文件哈希, fast_mode)
+        未提供文件哈希（content.file_hash 也为空）或解析出错时直接生成不缓存
+        """
+        file_hash = file_hash or content.file_hash
+        if not file_hash or content.error:
+            return self.get_structured_content(content, fast_mode)
+        
+        from .optimize_tools import cache_manager
+        
+        cache_key = f"pdf_structured_{file_hash}_{int(fast_mode)}"
+        structured = cache_manager.get(cache_key)
+        if structured is None:
+            structured = self.get_structured_content(content, fast_mode)
+            cache_manager.set(cache_key, structured)
+        return structured
     
     def batch_parse(self, pdf_folder: str, file_filter: List[str] = None,
                      progress_callback=None, use_cache: bool = True) -> List[PDFContent]:
         """
-        批量解析文件夹中的PDF
+        批量解析文件夹中的PDF（参数同 iter_parse）
+        
+        Returns:
+            PDFContent列表
+        """
+        return list(self.iter_parse(pdf_folder, file_filter, progress_callback, use_cache))
+    
+    def iter_parse(self, pdf_folder: str, file_filter: List[str] = None,
+                   progress_callback=None, use_cache: bool = True) -> Iterator[PDFContent]:
+        """
+        批量解析文件夹中的PDF，每解析完一个文件即产出结果，
+        便于下游（如AI提取）在全部解析完成前就开始处理
         
         优化备注：
         - 支持MD5校验避免重复解析
         - 支持缓存机制加速二次解析
         - 支持进度回调函数
+        - 读文件/MD5/查缓存在线程池中预取，与解析重叠
         
         Args:
             pdf_folder: PDF文件夹路径
@@ -493,16 +719,16 @@ class PDFParser:
             progress_callback: 进度回调函数 (current, total, filename, status)
             use_cache: 是否使用缓存
             
-        Returns:
-            PDFContent列表
+        Yields:
+            PDFContent（按文件顺序）
         """
-        from .optimize_tools import calculate_file_md5, cache_manager, config_manager, check_pdf_integrity
+        from .optimize_tools import cache_manager, config_manager
         
         pdf_folder = Path(pdf_folder)
         
         if not pdf_folder.exists():
             logger.error(f"文件夹不存在: {pdf_folder}")
-            return []
+            return
         
         # 获取PDF文件列表
         pdf_files = list(pdf_folder.glob('*.pdf')) + list(pdf_folder.glob('*.PDF'))
@@ -515,60 +741,64 @@ class PDFParser:
         
         enable_md5_check = config_manager.get('performance.enable_md5_check', True)
         enable_cache = config_manager.get('performance.enable_cache', True) and use_cache
+        use_md5_cache = enable_md5_check and enable_cache
         
-        results = []
         cached_count = 0
         
-        for idx, pdf_file in enumerate(pdf_files):
-            try:
-                # 进度回调
-                if progress_callback:
-                    progress_callback(idx, total_files, pdf_file.name, "processing")
-                
-                # 文件完整性检查
-                is_valid, error_msg = check_pdf_integrity(str(pdf_file))
-                if not is_valid:
-                    logger.warning(f"文件校验失败 {pdf_file.name}: {error_msg}")
-                    results.append(PDFContent(
-                        file_path=str(pdf_file),
-                        file_name=pdf_file.name,
-                        page_count=0,
-                        error=error_msg
-                    ))
-                    continue
+        # 读文件/完整性检查/MD5/查缓存 属于 I/O，在线程池中预取后续文件，与当前文件的解析重叠；
+        # 预取窗口有上限，避免一次把所有文件读入内存
+        with ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS) as prefetcher:
+            window = deque()
+            next_idx = 0
+            for idx, pdf_file in enumerate(pdf_files):
+                while next_idx < total_files and len(window) < self.PREFETCH_WORKERS * 2:
+                    window.append(prefetcher.submit(self._prefetch_file, pdf_files[next_idx], use_md5_cache))
+                    next_idx += 1
+                future = window.popleft()
                 
-                # MD5校验和缓存检查
-                cache_key = None
-                if enable_md5_check and enable_cache:
-                    file_md5 = calculate_file_md5(str(pdf_file))
-                    cache_key = f"pdf_parse_{file_md5}"
+                try:
+                    # 进度回调
+                    if progress_callback:
+                        progress_callback(idx, total_files, pdf_file.name, "processing")
+                    
+                    error_msg, file_md5, cached_result, data = future.result()
                     
-                    # 尝试从缓存获取
-                    cached_result = cache_manager.get(cache_key)
-                    if cached_result:
+                    # 文件完整性检查失败
+                    if error_msg is not None:
+                        logger.warning(f"文件校验失败 {pdf_file.name}: {error_msg}")
+                        content = PDFContent(
+                            file_path=str(pdf_file),
+                            file_name=pdf_file.name,
+                            page_count=0,
+                            error=error_msg
+                        )
+                    elif cached_result:
                         logger.info(f"从缓存加载: {pdf_file.name}")
-                        results.append(cached_result)
+                        cached_result.file_hash = file_md5
+                        content = cached_result
                         cached_count += 1
-                        continue
-                
-                # 解析PDF
-                content = self.parse_pdf(str(pdf_file))
-                results.append(content)
-                
-                # 保存到缓存
-                if cache_key and not content.error:
-                    cache_manager.set(cache_key, content)
-                
-                logger.info(f"成功解析: {pdf_file.name}")
+                    else:
+                        # 解析PDF
+                        content = self.parse_pdf(str(pdf_file), data)
+                        data = None
+                        content.file_hash = file_md5
+                        
+                        # 保存到缓存
+                        if file_md5 and not content.error:
+                            cache_manager.set(f"pdf_parse_{file_md5}", content)
+                        
+                        logger.info(f"成功解析: {pdf_file.name}")
+                    
+                except Exception as e:
+                    logger.error(f"解析失败 {pdf_file.name}: {e}")
+                    content = PDFContent(
+                        file_path=str(pdf_file),
+                        file_name=pdf_file.name,
+                        page_count=0,
+                        error=str(e)
+                    )
                 
-            except Exception as e:
-                logger.error(f"解析失败 {pdf_file.name}: {e}")
-                results.append(PDFContent(
-                    file_path=str(pdf_file),
-                    file_name=pdf_file.name,
-                    page_count=0,
-                    error=str(e)
-                ))
+                yield content
         
         # 最终进度回调
         if progress_callback:
@@ -576,8 +806,45 @@ class PDFParser:
         
         if cached_count > 0:
             logger.info(f"缓存命中: {cached_count}/{total_files} 个文件")
+    
+    def _prefetch_file(self, pdf_file: Path, use_md5_cache: bool
+                       ) -> Tuple[Optional[str], Optional[str], Optional[PDFContent], Optional[bytes]]:
+        """
+        batch_parse 的 I/O 阶段（在线程池中执行）：完整性检查、MD5、查缓存、读取文件内容
         
-        return results
+        Returns:
+            (校验错误信息, 文件哈希, 缓存命中的结果, 待解析的文件内容)
+        """
+        from .optimize_tools import calculate_bytes_hash, cache_manager, check_pdf_integrity
+        
+        # 文件完整性检查
+        is_valid, error_msg = check_pdf_integrity(str(pdf_file))
+        if not is_valid:
+            return error_msg, None, None, None
+        
+        # MD5校验和缓存检查
+        # 整份文件只读一次：同一份内存数据既用于哈希也用于解析
+        file_md5 = None
+        data = None
+        if use_md5_cache:
+            # 先按 (路径, 大小, 修改时间) 查找已算过的MD5，文件未变化时无需重新读取整份文件
+            st = pdf_file.stat()
+            stat_key = f"pdf_md5_{pdf_file.resolve()}_{st.st_size}_{st.st_mtime_ns}"
+            file_md5 = cache_manager.get(stat_key)
+            if not file_md5:
+                data = pdf_file.read_bytes()
+                file_md5 = calculate_bytes_hash(data)
+                if file_md5:
+                    cache_manager.set(stat_key, file_md5)
+            
+            # 尝试从缓存获取
+            cached_result = cache_manager.get(f"pdf_parse_{file_md5}")
+            if cached_result:
+                return None, file_md5, cached_result, None
+        
+        if data is None:
+            data = pdf_file.read_bytes()
+        return None, file_md5, None, data
     
     def batch_parse_multiprocess(self, pdf_folder: str, file_filter: List[str] = None,
                                   max_workers: int = None, progress_callback=None) -> List[PDFContent]:
@@ -625,51 +892,151 @@ class PDFParser:
         
         logger.info(f"使用 {max_workers} 进程解析 {total_files} 个PDF")
         
-        results = []
+        timeout = config.parser.pdf_timeout
+        results: List[Optional[PDFContent]] = [None] * total_files
+        statuses = ["success"] * total_files
         completed = 0
         
+        def report(idx: int):
+            nonlocal completed
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total_files, pdf_files[idx].name, statuses[idx])
+        
+        finished = [False] * total_files
+        page_parts: List[Dict[int, PDFContent]] = [{} for _ in range(total_files)]
+        parts_left = [0] * total_files
+        
+        def finish(idx: int):
+            finished[idx] = True
+            report(idx)
+        
         with ProcessPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(self._parse_single_file, str(f)): f for f in pdf_files}
+            # 按页分片提交：所有文件共享同一进程池，单个大PDF也能并行
+            # 任务为 (路径, 起始页, 结束页)；起始页为 None 表示整文件任务，_FALLBACK_TASK 表示回退任务
+            # owners: future -> [(文件索引, 起始页), ...]，与该 future 返回的结果列表一一对应
+            owners = {}
+            single_jobs = []  # 只有一个任务的文件，分批提交以减少进程间往返
+            for idx, pdf_file in enumerate(pdf_files):
+                ranges = self._split_page_ranges(pdf_file, max_workers)
+                if ranges is None:
+                    single_jobs.append((idx, (str(pdf_file), None, None)))
+                    continue
+                parts_left[idx] = len(ranges)
+                if len(ranges) == 1:
+                    single_jobs.append((idx, (str(pdf_file),) + ranges[0]))
+                    continue
+                for start, stop in ranges:
+                    future = executor.submit(_parse_jobs_worker, [(str(pdf_file), start, stop)])
+                    owners[future] = [(idx, start)]
             
-            for future in futures:
-                pdf_file = futures[future]
-                try:
-                    content = future.result(timeout=config.parser.pdf_timeout)
-                    results.append(content)
-                    completed += 1
+            chunksize = max(1, -(-len(single_jobs) // (4 * max_workers)))
+            for i in range(0, len(single_jobs), chunksize):
+                batch = single_jobs[i:i + chunksize]
+                future = executor.submit(_parse_jobs_worker, [job for _, job in batch])
+                owners[future] = [(idx, job[1]) for idx, job in batch]
+            
+            # 按完成顺序处理结果；超过 timeout 秒没有任何任务完成视为超时
+            pending = set(owners)
+            while pending:
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    for future in pending:
+                        future.cancel()
+                    for idx in sorted({idx for future in pending for idx, _ in owners[future]}):
+                        if finished[idx]:
+                            continue
+                        if results[idx] is None:
+                            logger.error(f"解析超时: {pdf_files[idx].name}")
+                            results[idx] = self._error_content(pdf_files[idx], "解析超时")
+                            statuses[idx] = "timeout"
+                        finish(idx)
+                    break
+                
+                for future in done:
+                    jobs = owners.pop(future)
+                    try:
+                        contents = future.result()
+                    except Exception as e:
+                        contents = [e] * len(jobs)
                     
-                    if progress_callback:
-                        progress_callback(completed, total_files, pdf_file.name, "success")
+                    for (idx, start), content in zip(jobs, contents):
+                        if finished[idx]:
+                            continue
+                        pdf_file = pdf_files[idx]
+                        if isinstance(content, Exception):
+                            if start == _FALLBACK_TASK:
+                                logger.warning(f"pdfplumber回退解析失败 {pdf_file.name}: {content}")
+                            else:
+                                logger.error(f"解析失败 {pdf_file.name}: {content}")
+                                results[idx] = self._error_content(pdf_file, str(content))
+                                statuses[idx] = "error"
+                            finish(idx)
+                            continue
                         
-                except TimeoutError:
-                    logger.error(f"解析超时: {pdf_file.name}")
-                    results.append(PDFContent(
-                        file_path=str(pdf_file),
-                        file_name=pdf_file.name,
-                        page_count=0,
-                        error="解析超时"
-                    ))
-                    completed += 1
-                    if progress_callback:
-                        progress_callback(completed, total_files, pdf_file.name, "timeout")
-                        
-                except Exception as e:
-                    logger.error(f"解析失败 {pdf_file.name}: {e}")
-                    results.append(PDFContent(
-                        file_path=str(pdf_file),
-                        file_name=pdf_file.name,
-                        page_count=0,
-                        error=str(e)
-                    ))
-                    completed += 1
-                    if progress_callback:
-                        progress_callback(completed, total_files, pdf_file.name, "error")
+                        if start == _FALLBACK_TASK:
+                            if self._is_better_content(content, results[idx]):
+                                results[idx] = content
+                            finish(idx)
+                        elif start is None:
+                            results[idx] = content
+                            finish(idx)
+                        else:
+                            page_parts[idx][start] = content
+                            parts_left[idx] -= 1
+                            if parts_left[idx]:
+                                continue
+                            # 全部分片完成：按页序合并，PyMuPDF结果不充分时提交pdfplumber回退任务
+                            parts = page_parts[idx]
+                            content = self._merge_page_parts([parts[k] for k in sorted(parts)])
+                            results[idx] = content
+                            if content.error or self._needs_pdfplumber(content):
+                                fallback = executor.submit(_parse_jobs_worker,
+                                                           [(str(pdf_file), _FALLBACK_TASK, None)])
+                                owners[fallback] = [(idx, _FALLBACK_TASK)]
+                                pending.add(fallback)
+                            else:
+                                finish(idx)
         
         return results
     
-    def _parse_single_file(self, pdf_path: str) -> PDFContent:
-        """单文件解析（用于多进程）"""
-        return self.parse_pdf(pdf_path)
+    def _split_page_ranges(self, pdf_file: Path, max_workers: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        计算PDF的分页任务区间 [(start, stop), ...]
+        未启用PyMuPDF优先或无法读取页数时返回 None（整文件作为一个任务）
+        """
+        if not getattr(config.parser, 'prefer_pymupdf', True):
+            return None
+        try:
+            with fitz.open(pdf_file, filetype="pdf") as doc:
+                page_count = len(doc)
+        except Exception:
+            return None
+        if page_count == 0:
+            return None
+        chunk = max(self.MIN_PAGES_PER_TASK, -(-page_count // max(1, max_workers)))
+        return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    
+    @staticmethod
+    def _merge_page_parts(parts: List[PDFContent]) -> PDFContent:
+        """按页序合并分片解析结果（parts 已按起始页排序）"""
+        content = parts[0]
+        for part in parts[1:]:
+            content.texts.extend(part.texts)
+            content.tables.extend(part.tables)
+            if part.error and not content.error:
+                content.error = part.error
+        return content
+    
+    @staticmethod
+    def _error_content(pdf_file: Path, error: str) -> PDFContent:
+        """构造解析失败的结果"""
+        return PDFContent(
+            file_path=str(pdf_file),
+            file_name=pdf_file.name,
+            page_count=0,
+            error=error
+        )
     
     def get_pdf_list(self, folder_path: str) -> List[Dict[str, Any]]:
         """
@@ -700,3 +1067,41 @@ class PDFParser:
         
         return sorted(result, key=lambda x: x['name'])
 
+
+# =====================================================
+# 多进程工作函数（模块级，避免每个任务序列化解析器实例）
+# =====================================================
+
+_worker_parser: Optional[PDFParser] = None
+
+# batch_parse_multiprocess 中标记pdfplumber回退任务的起始页占位值
+_FALLBACK_TASK = -1
+
+
+def _get_worker_parser() -> PDFParser:
+    """每个工作进程只创建一次解析器"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = PDFParser()
+    return _worker_parser
+
+
+def _parse_jobs_worker(jobs: List[Tuple[str, Optional[int], Optional[int]]]) -> List[Any]:
+    """
+    批量执行解析任务 (路径, 起始页, 结束页)，返回与任务一一对应的结果
+    起始页为 None：整文件解析；为 _FALLBACK_TASK：pdfplumber回退解析；否则：PyMuPDF解析 [起始页, 结束页)
+    单个任务抛出的异常作为结果返回，不影响同批其他任务
+    """
+    parser = _get_worker_parser()
+    results = []
+    for pdf_path, start, stop in jobs:
+        try:
+            if start is None:
+                results.append(parser.parse_pdf(pdf_path))
+            elif start == _FALLBACK_TASK:
+                results.append(parser._parse_with_pdfplumber(Path(pdf_path)))
+            else:
+                results.append(parser._parse_pymupdf_pages(Path(pdf_path), start, stop))
+        except Exception as e:
+            results.append(e)
+    return results
@@ -4,15 +4,29 @@
 负责用户认证、密码加密、权限控制等功能
 """
 
+import atexit
 import logging
+import hashlib
+import queue
 import bcrypt
 import re
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy.orm import Session
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterator
+from sqlalchemy import Row, case, delete, func, update
+from sqlalchemy.orm import Session, load_only
 
 from .db_manager import DatabaseManager, User, UserLog
 
+try:
+    from .config import BCRYPT_COST
+except ImportError:
+    BCRYPT_COST = 12
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -20,6 +34,106 @@ logger = logging.getLogger(__name__)
 MAX_LOGIN_ATTEMPTS = 5  # 最大登录失败次数
 LOCKOUT_DURATION = 10  # 锁定时长（分钟）
 REMEMBER_ME_DAYS = 7  # 记住我有效期（天）
+USER_CACHE_TTL = 60  # 用户信息/API密钥缓存有效期（秒）
+USER_CACHE_MAXSIZE = 1024  # 缓存条目上限，超出时整体清空
+LOG_BATCH_SIZE = 500  # 操作日志批量写入的最大条数
+LOG_FLUSH_INTERVAL = 1.0  # 操作日志攒批的最长等待时间（秒）
+
+# 输入清理用的危险字符（模块加载时编译一次）
+_SANITIZE_RE = re.compile(r'[;\'"\\]')
+# 用户名合法格式：3-20个字符，不含空白及危险字符（一次匹配完成全部校验）
+_USERNAME_RE = re.compile(r'[^\s;\'"\\]{3,20}')
+
+# 预哈希密码格式标记：bcrypt(hex(sha256(密码)))，无此前缀的为旧版直接bcrypt的哈希
+PREHASH_TAG = "sh256$"
+_PREHASH_TAG_BYTES = PREHASH_TAG.encode('ascii')
+# bcrypt哈希的合法前缀；不符合的存储值直接判定失败，不做昂贵的bcrypt计算
+_BCRYPT_PREFIXES = (b'$2a$', b'$2b$', b'$2y$')
+# 校验时接受的最大密码长度，超长输入直接拒绝
+MAX_PASSWORD_INPUT_LENGTH = 256
+
+
+def _prehash(password: str) -> bytes:
+    """
+    SHA-256预哈希密码，规避bcrypt只取前72字节及遇NUL截断的问题
+    输出固定64字节十六进制串，成本相对bcrypt可忽略
+    """
+    return hashlib.sha256(password.encode('utf-8')).hexdigest().encode('ascii')
+
+
+# 用户不存在时用于空跑校验的哈希，使"用户不存在"与"密码错误"耗时一致，避免按响应时间枚举用户名
+# 生成一次约需数百毫秒，放到后台线程计算，不阻塞模块导入/应用启动
+_DUMMY_HASH_FUTURE = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bcrypt-dummy").submit(
+    bcrypt.hashpw, _prehash("x"), bcrypt.gensalt(rounds=BCRYPT_COST)
+)
+
+
+# 认证只加载需要的列（不取 ai_api_key 等），返回的用户对象上也只有这些列可读
+_AUTH_COLUMNS = load_only(
+    User.id, User.username, User.is_active, User.password_hash,
+    User.login_attempts, User.locked_until, User.role, User.last_login
+)
+
+# 请求级共享会话：(数据库管理器, 会话)，由 UserManager.request_scope 设置
+_current_session: ContextVar[Optional[Tuple[DatabaseManager, Session]]] = ContextVar(
+    'user_manager_session', default=None
+)
+
+
+class _LogWriter:
+    """
+    用户操作日志批量写入器
+    日志先进入队列，由后台线程按批（最多 LOG_BATCH_SIZE 条或等待 LOG_FLUSH_INTERVAL 秒）
+    一次插入并提交，避免每条日志单独开会话、单独提交
+    """
+    
+    def __init__(self, db: DatabaseManager):
+        self._db = db
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def put(self, record: Dict[str, Any]):
+        """日志入队，首次调用时启动后台线程"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    thread = threading.Thread(target=self._loop, name="user-log-writer", daemon=True)
+                    thread.start()
+                    self._thread = thread
+                    atexit.register(self.flush)
+        self._queue.put(record)
+    
+    def flush(self):
+        """阻塞直到队列中的日志全部写入（读取日志前、进程退出时调用）"""
+        if self._thread is not None:
+            # 放入 None 标记，后台线程收到后立即写出当前批次，无需等满攒批时间
+            self._queue.put(None)
+            self._queue.join()
+    
+    def _loop(self):
+        """后台线程：攒批后一次写入，单批失败只记录错误，不影响后续日志"""
+        while True:
+            items = [self._queue.get()]
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            while items[-1] is not None and len(items) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            batch = [item for item in items if item is not None]
+            try:
+                if batch:
+                    with self._db.session_scope() as session:
+                        session.bulk_insert_mappings(UserLog, batch)
+            except Exception as e:
+                logger.error(f"批量写入用户日志失败: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
 
 
 class UserManager:
@@ -36,13 +150,69 @@ class UserManager:
             db_manager: 数据库管理器实例
         """
         self.db = db_manager or DatabaseManager()
+        
+        # 用户缓存：user_id -> (过期时间戳, 值)；读多写少，变更时按 user_id 失效
+        self._user_cache: Dict[int, Tuple[float, User]] = {}
+        self._api_key_cache: Dict[int, Tuple[float, Optional[str]]] = {}
+        self._cache_lock = threading.Lock()
+        
+        # 操作日志批量写入器
+        self._log_writer = _LogWriter(self.db)
+    
+    def _cache_get(self, cache: Dict[int, Tuple[float, Any]], user_id: int) -> Tuple[bool, Any]:
+        """读取缓存，返回 (是否命中, 值)"""
+        with self._cache_lock:
+            cached = cache.get(user_id)
+            if cached is not None and time.time() < cached[0]:
+                return True, cached[1]
+            return False, None
+    
+    def _cache_put(self, cache: Dict[int, Tuple[float, Any]], user_id: int, value: Any):
+        """写入缓存"""
+        with self._cache_lock:
+            if len(cache) >= USER_CACHE_MAXSIZE:
+                cache.clear()
+            cache[user_id] = (time.time() + USER_CACHE_TTL, value)
+    
+    def _invalidate_user_cache(self, user_id: int):
+        """用户信息变更后使该用户的缓存失效"""
+        with self._cache_lock:
+            self._user_cache.pop(user_id, None)
+            self._api_key_cache.pop(user_id, None)
+    
+    @contextmanager
+    def request_scope(self) -> Iterator[Session]:
+        """
+        请求级会话：同一请求（上下文）内的多个只读查询共享一个会话，
+        退出时统一提交并关闭；已处于请求级会话中时直接复用
+        """
+        current = _current_session.get()
+        if current is not None and current[0] is self.db:
+            yield current[1]
+            return
+        with self.db.session_scope() as session:
+            token = _current_session.set((self.db, session))
+            try:
+                yield session
+            finally:
+                _current_session.reset(token)
+    
+    @contextmanager
+    def _read_scope(self) -> Iterator[Session]:
+        """只读查询使用的会话：优先复用请求级会话，否则单独开启"""
+        current = _current_session.get()
+        if current is not None and current[0] is self.db:
+            yield current[1]
+        else:
+            with self.db.session_scope() as session:
+                yield session
     
     # ==================== 密码加密相关 ====================
     
     @staticmethod
     def hash_password(password: str) -> str:
         """
-        使用bcrypt加密密码
+        使用bcrypt加密密码（先做SHA-256预哈希，结果带格式标记）
         
         Args:
             password: 明文密码
@@ -50,28 +220,47 @@ class UserManager:
         Returns:
             加密后的密码哈希值
         """
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        salt = bcrypt.gensalt(rounds=BCRYPT_COST)
+        hashed = bcrypt.hashpw(_prehash(password), salt)
+        return PREHASH_TAG + hashed.decode('utf-8')
     
     @staticmethod
-    def verify_password(password: str, password_hash: str) -> bool:
+    def verify_password(password: str, password_hash: Union[str, bytes]) -> bool:
         """
         验证密码是否正确
         
         Args:
             password: 明文密码
-            password_hash: 存储的密码哈希值
+            password_hash: 存储的密码哈希值（str，或已编码的bytes，可免去重复编码）
             
         Returns:
             密码是否匹配
         """
+        if not password_hash or len(password) > MAX_PASSWORD_INPUT_LENGTH:
+            return False
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+            # 哈希值只含ASCII字符，统一转为bytes后直接切片交给bcrypt
+            if isinstance(password_hash, str):
+                password_hash = password_hash.encode('ascii')
+            prehashed = password_hash.startswith(_PREHASH_TAG_BYTES)
+            if prehashed:
+                password_hash = password_hash[len(_PREHASH_TAG_BYTES):]
+            # 非bcrypt格式的哈希直接失败，O(1)
+            if not password_hash.startswith(_BCRYPT_PREFIXES):
+                return False
+            if prehashed:
+                return bcrypt.checkpw(_prehash(password), password_hash)
+            # 旧版哈希：直接bcrypt明文
+            return bcrypt.checkpw(password.encode('utf-8'), password_hash)
         except Exception as e:
             logger.error(f"密码验证失败: {e}")
             return False
     
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        """旧版哈希（无预哈希标记）需要在下次登录成功时重新加密"""
+        return not password_hash.startswith(PREHASH_TAG)
+    
     @staticmethod
     def validate_password_strength(password: str) -> Tuple[bool, str]:
         """
@@ -103,7 +292,7 @@ class UserManager:
         if not input_str:
             return ""
         # 移除危险字符
-        return re.sub(r'[;\'"\\]', '', input_str.strip())
+        return _SANITIZE_RE.sub('', input_str.strip())
     
     # ==================== 用户认证相关 ====================
     
@@ -116,61 +305,67 @@ class UserManager:
             password: 密码
             
         Returns:
-            (是否成功, 消息, 用户对象)
+            (是否成功, 消息, 用户对象)；用户对象只加载认证相关列（id/username/role 等），
+            完整信息请用 get_user_by_id 获取
         """
-        session = self.db.get_session()
         try:
-            # 清理输入
-            username = self.sanitize_input(username)
-            
-            # 查找用户
-            user = session.query(User).filter_by(username=username).first()
-            
-            if not user:
-                return False, "用户名或密码错误", None
-            
-            # 检查账号是否被禁用
-            if not user.is_active:
-                return False, "账号已被禁用，请联系管理员", None
-            
-            # 检查是否被锁定
-            if user.locked_until and user.locked_until > datetime.now():
-                remaining = (user.locked_until - datetime.now()).seconds // 60
-                return False, f"账号已被锁定，请{remaining + 1}分钟后再试", None
-            
-            # 验证密码
-            if not self.verify_password(password, user.password_hash):
-                # 增加失败次数
-                user.login_attempts += 1
+            with self.db.session_scope() as session:
+                # 清理输入
+                username = self.sanitize_input(username)
                 
-                # 达到最大失败次数，锁定账号
-                if user.login_attempts >= MAX_LOGIN_ATTEMPTS:
-                    user.locked_until = datetime.now() + timedelta(minutes=LOCKOUT_DURATION)
-                    session.commit()
-                    return False, f"密码错误次数过多，账号已锁定{LOCKOUT_DURATION}分钟", None
+                # 查找用户
+                user = session.query(User).options(_AUTH_COLUMNS).filter_by(username=username).first()
                 
-                session.commit()
-                remaining = MAX_LOGIN_ATTEMPTS - user.login_attempts
-                return False, f"密码错误，还剩{remaining}次机会", None
-            
-            # 登录成功，重置失败次数
-            user.login_attempts = 0
-            user.locked_until = None
-            user.last_login = datetime.now()
-            session.commit()
-            
-            # 记录登录日志
-            self.add_user_log(user.id, "LOGIN", "用户登录成功")
+                if not user:
+                    # 空跑一次bcrypt校验，结果丢弃
+                    bcrypt.checkpw(_prehash(password), _DUMMY_HASH_FUTURE.result())
+                    return False, "用户名或密码错误", None
+                
+                # 检查账号是否被禁用
+                if not user.is_active:
+                    return False, "账号已被禁用，请联系管理员", None
+                
+                # 本次认证统一使用同一时间点（与库中时间一致，均为本地时间）
+                now = datetime.now()
+                
+                # 检查是否被锁定
+                if user.locked_until and user.locked_until > now:
+                    remaining = (user.locked_until - now).seconds // 60
+                    return False, f"账号已被锁定，请{remaining + 1}分钟后再试", None
+                
+                # 验证密码
+                if not self.verify_password(password, user.password_hash):
+                    # 增加失败次数（退出上下文时提交）
+                    user.login_attempts += 1
+                    
+                    # 达到最大失败次数，锁定账号
+                    if user.login_attempts >= MAX_LOGIN_ATTEMPTS:
+                        user.locked_until = now + timedelta(minutes=LOCKOUT_DURATION)
+                        return False, f"密码错误次数过多，账号已锁定{LOCKOUT_DURATION}分钟", None
+                    
+                    remaining = MAX_LOGIN_ATTEMPTS - user.login_attempts
+                    return False, f"密码错误，还剩{remaining}次机会", None
+                
+                # 登录成功，重置失败次数
+                user.login_attempts = 0
+                user.locked_until = None
+                user.last_login = now
+                
+                # 旧版哈希登录成功后升级为预哈希格式
+                if self.needs_rehash(user.password_hash):
+                    user.password_hash = self.hash_password(password)
+                
+                # 记录登录日志（与状态更新同一事务提交）
+                self._add_user_log_in_session(session, user.id, "LOGIN", "用户登录成功")
+            # 登录时间等字段已更新
+            self._invalidate_user_cache(user.id)
             
             logger.info(f"用户 {username} 登录成功")
             return True, "登录成功", user
             
         except Exception as e:
-            session.rollback()
             logger.error(f"认证失败: {e}")
             return False, "系统错误，请稍后再试", None
-        finally:
-            session.close()
     
     def logout(self, user_id: int):
         """
@@ -196,43 +391,41 @@ class UserManager:
         Returns:
             (是否成功, 消息)
         """
-        session = self.db.get_session()
-        try:
-            # 验证用户名
-            username = self.sanitize_input(username)
-            if not username or len(username) < 3:
+        # 验证用户名（仅在不合法时再区分具体原因）
+        username = (username or "").strip()
+        if not _USERNAME_RE.fullmatch(username):
+            if len(username) < 3:
                 return False, "用户名至少3个字符"
             if len(username) > 20:
                 return False, "用户名不能超过20个字符"
-            
-            # 检查用户名是否已存在
-            existing = session.query(User).filter_by(username=username).first()
-            if existing:
-                return False, "用户名已存在"
-            
-            # 验证密码强度
-            valid, msg = self.validate_password_strength(password)
-            if not valid:
-                return False, msg
-            
-            # 创建用户
-            user = User(
-                username=username,
-                password_hash=self.hash_password(password),
-                role=role if role in ['admin', 'user'] else 'user'
-            )
-            session.add(user)
-            session.commit()
+            return False, "用户名格式不合法，不能包含空白或特殊字符"
+        
+        try:
+            with self.db.session_scope() as session:
+                # 检查用户名是否已存在
+                existing = session.query(User).filter_by(username=username).first()
+                if existing:
+                    return False, "用户名已存在"
+                
+                # 验证密码强度
+                valid, msg = self.validate_password_strength(password)
+                if not valid:
+                    return False, msg
+                
+                # 创建用户
+                user = User(
+                    username=username,
+                    password_hash=self.hash_password(password),
+                    role=role if role in ['admin', 'user'] else 'user'
+                )
+                session.add(user)
             
             logger.info(f"创建用户成功: {username}, 角色: {role}")
             return True, "用户创建成功"
             
         except Exception as e:
-            session.rollback()
             logger.error(f"创建用户失败: {e}")
             return False, f"创建失败: {str(e)}"
-        finally:
-            session.close()
     
     def change_password(self, user_id: int, old_password: str, new_password: str) -> Tuple[bool, str]:
         """
@@ -246,87 +439,87 @@ class UserManager:
         Returns:
             (是否成功, 消息)
         """
-        session = self.db.get_session()
         try:
-            user = session.query(User).filter_by(id=user_id).first()
-            if not user:
-                return False, "用户不存在"
-            
-            # 验证原密码
-            if not self.verify_password(old_password, user.password_hash):
-                return False, "原密码错误"
-            
-            # 验证新密码强度
-            valid, msg = self.validate_password_strength(new_password)
-            if not valid:
-                return False, msg
-            
-            # 更新密码
-            user.password_hash = self.hash_password(new_password)
-            session.commit()
-            
-            # 记录日志
-            self.add_user_log(user_id, "CHANGE_PASSWORD", "修改密码成功")
+            with self.db.session_scope() as session:
+                user = session.get(User, user_id)
+                if not user:
+                    return False, "用户不存在"
+                
+                # 验证原密码
+                if not self.verify_password(old_password, user.password_hash):
+                    return False, "原密码错误"
+                
+                # 验证新密码强度
+                valid, msg = self.validate_password_strength(new_password)
+                if not valid:
+                    return False, msg
+                
+                # 更新密码
+                user.password_hash = self.hash_password(new_password)
+                
+                # 记录日志（与密码更新同一事务提交）
+                self._add_user_log_in_session(session, user_id, "CHANGE_PASSWORD", "修改密码成功")
+            self._invalidate_user_cache(user_id)
             
             logger.info(f"用户ID {user_id} 修改密码成功")
             return True, "密码修改成功"
             
         except Exception as e:
-            session.rollback()
             logger.error(f"修改密码失败: {e}")
             return False, "修改失败，请稍后再试"
-        finally:
-            session.close()
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        """根据ID获取用户"""
-        session = self.db.get_session()
-        try:
-            return session.query(User).filter_by(id=user_id).first()
-        finally:
-            session.close()
+        """根据ID获取用户（带TTL缓存）"""
+        hit, user = self._cache_get(self._user_cache, user_id)
+        if hit:
+            return user
+        with self._read_scope() as session:
+            user = session.get(User, user_id)
+        if user is not None:
+            self._cache_put(self._user_cache, user_id, user)
+        return user
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """根据用户名获取用户"""
-        session = self.db.get_session()
-        try:
+        with self._read_scope() as session:
             return session.query(User).filter_by(username=username).first()
-        finally:
-            session.close()
 
     def get_user_api_key(self, user_id: int) -> Optional[str]:
-        """获取用户专属API密钥（为空表示使用系统默认）"""
-        session = self.db.get_session()
-        try:
-            user = session.query(User).filter_by(id=user_id).first()
-            return user.ai_api_key if user else None
-        finally:
-            session.close()
+        """获取用户专属API密钥（为空表示使用系统默认，带TTL缓存）"""
+        hit, api_key = self._cache_get(self._api_key_cache, user_id)
+        if hit:
+            return api_key
+        with self._read_scope() as session:
+            user = session.get(User, user_id)
+            if user is None:
+                return None
+            api_key = user.ai_api_key
+        self._cache_put(self._api_key_cache, user_id, api_key)
+        return api_key
 
     def set_user_api_key(self, user_id: int, api_key: str) -> bool:
         """设置用户专属API密钥（传空串则清除，回退为系统默认）"""
-        session = self.db.get_session()
         try:
-            user = session.query(User).filter_by(id=user_id).first()
-            if not user:
-                return False
-            user.ai_api_key = api_key if api_key else None
-            session.commit()
+            with self.db.session_scope() as session:
+                user = session.get(User, user_id)
+                if not user:
+                    return False
+                user.ai_api_key = api_key if api_key else None
+            self._invalidate_user_cache(user_id)
             return True
         except Exception as e:
-            session.rollback()
             logger.error(f"设置API密钥失败: {e}")
             return False
-        finally:
-            session.close()
     
-    def get_all_users(self) -> List[User]:
-        """获取所有用户"""
-        session = self.db.get_session()
-        try:
-            return session.query(User).order_by(User.created_at.desc()).all()
-        finally:
-            session.close()
+    def get_all_users(self) -> List[Row]:
+        """
+        获取所有用户（用户列表展示用）
+        只查询展示所需列，返回轻量行对象（支持 u.id / u.username 等属性访问），不构造完整ORM实例
+        """
+        with self.db.session_scope() as session:
+            return session.query(
+                User.id, User.username, User.role, User.is_active, User.created_at
+            ).order_by(User.created_at.desc()).all()
     
     def update_user_status(self, user_id: int, is_active: bool) -> bool:
         """
@@ -339,22 +532,18 @@ class UserManager:
         Returns:
             是否成功
         """
-        session = self.db.get_session()
         try:
-            user = session.query(User).filter_by(id=user_id).first()
-            if user:
+            with self.db.session_scope() as session:
+                user = session.get(User, user_id)
+                if not user:
+                    return False
                 user.is_active = is_active
-                session.commit()
-                action = "ENABLE_USER" if is_active else "DISABLE_USER"
-                logger.info(f"用户ID {user_id} 状态更新为: {is_active}")
-                return True
-            return False
+            self._invalidate_user_cache(user_id)
+            logger.info(f"用户ID {user_id} 状态更新为: {is_active}")
+            return True
         except Exception as e:
-            session.rollback()
             logger.error(f"更新用户状态失败: {e}")
             return False
-        finally:
-            session.close()
     
     def update_user_role(self, user_id: int, role: str) -> bool:
         """
@@ -367,49 +556,92 @@ class UserManager:
         Returns:
             是否成功
         """
-        session = self.db.get_session()
+        if role not in ['admin', 'user']:
+            return False
+        
         try:
-            if role not in ['admin', 'user']:
-                return False
-            
-            user = session.query(User).filter_by(id=user_id).first()
-            if user:
+            with self.db.session_scope() as session:
+                user = session.get(User, user_id)
+                if not user:
+                    return False
                 user.role = role
-                session.commit()
-                logger.info(f"用户ID {user_id} 角色更新为: {role}")
-                return True
-            return False
+            self._invalidate_user_cache(user_id)
+            logger.info(f"用户ID {user_id} 角色更新为: {role}")
+            return True
         except Exception as e:
-            session.rollback()
             logger.error(f"更新用户角色失败: {e}")
             return False
-        finally:
-            session.close()
+    
+    def bulk_update_user_status(self, user_ids: List[int], is_active: bool) -> int:
+        """
+        批量更新用户状态（一条UPDATE语句完成）
+        
+        Args:
+            user_ids: 用户ID列表
+            is_active: 是否启用
+            
+        Returns:
+            实际更新的用户数
+        """
+        return self._bulk_update_users(user_ids, is_active=is_active)
+    
+    def bulk_update_user_role(self, user_ids: List[int], role: str) -> int:
+        """
+        批量更新用户角色（一条UPDATE语句完成）
+        
+        Args:
+            user_ids: 用户ID列表
+            role: 新角色
+            
+        Returns:
+            实际更新的用户数
+        """
+        if role not in ['admin', 'user']:
+            return 0
+        return self._bulk_update_users(user_ids, role=role)
+    
+    def _bulk_update_users(self, user_ids: List[int], **values) -> int:
+        """按ID列表批量更新用户字段，返回更新行数"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        try:
+            with self.db.session_scope() as session:
+                result = session.execute(
+                    update(User)
+                    .where(User.id.in_(user_ids))
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            for user_id in user_ids:
+                self._invalidate_user_cache(user_id)
+            logger.info(f"批量更新 {result.rowcount} 个用户: {values}")
+            return result.rowcount
+        except Exception as e:
+            logger.error(f"批量更新用户失败: {e}")
+            return 0
     
     def delete_user(self, user_id: int) -> bool:
         """删除用户"""
-        session = self.db.get_session()
         try:
-            user = session.query(User).filter_by(id=user_id).first()
-            if user:
+            with self.db.session_scope() as session:
+                user = session.get(User, user_id)
+                if not user:
+                    return False
                 session.delete(user)
-                session.commit()
-                logger.info(f"删除用户ID: {user_id}")
-                return True
-            return False
+            self._invalidate_user_cache(user_id)
+            logger.info(f"删除用户ID: {user_id}")
+            return True
         except Exception as e:
-            session.rollback()
             logger.error(f"删除用户失败: {e}")
             return False
-        finally:
-            session.close()
     
     # ==================== 用户日志相关 ====================
     
     def add_user_log(self, user_id: int, action: str, detail: str = None, 
                      ip_address: str = None) -> bool:
         """
-        添加用户操作日志
+        添加用户操作日志（入队后由后台线程批量写入）
         
         Args:
             user_id: 用户ID
@@ -420,27 +652,43 @@ class UserManager:
         Returns:
             是否成功
         """
-        session = self.db.get_session()
-        try:
-            log = UserLog(
-                user_id=user_id,
-                action=action,
-                detail=detail,
-                ip_address=ip_address
-            )
-            session.add(log)
-            session.commit()
-            return True
-        except Exception as e:
-            session.rollback()
-            logger.error(f"添加用户日志失败: {e}")
-            return False
-        finally:
-            session.close()
+        self._log_writer.put({
+            'user_id': user_id,
+            'action': action,
+            'detail': detail,
+            'ip_address': ip_address,
+            'created_at': datetime.now()
+        })
+        return True
+    
+    @staticmethod
+    def _add_user_log_in_session(session: Session, user_id: int, action: str,
+                                 detail: str = None, ip_address: str = None) -> UserLog:
+        """
+        在已有会话中追加用户操作日志（不提交，由调用方统一提交）
+        
+        Args:
+            session: 当前数据库会话
+            user_id: 用户ID
+            action: 操作类型
+            detail: 操作详情
+            ip_address: IP地址
+            
+        Returns:
+            日志对象
+        """
+        log = UserLog(
+            user_id=user_id,
+            action=action,
+            detail=detail,
+            ip_address=ip_address
+        )
+        session.add(log)
+        return log
     
     def get_user_logs(self, user_id: int = None, action: str = None,
                       start_time: datetime = None, end_time: datetime = None,
-                      limit: int = 100) -> List[UserLog]:
+                      limit: int = 100) -> List[Row]:
         """
         获取用户操作日志
         
@@ -452,11 +700,15 @@ class UserManager:
             limit: 返回数量限制
             
         Returns:
-            日志列表
+            日志行列表（支持 log.action / log.created_at 等属性访问）
         """
-        session = self.db.get_session()
-        try:
-            query = session.query(UserLog)
+        # 先写入排队中的日志，保证读到最新记录
+        self._log_writer.flush()
+        with self.db.session_scope() as session:
+            query = session.query(
+                UserLog.id, UserLog.user_id, UserLog.action, UserLog.detail,
+                UserLog.ip_address, UserLog.created_at
+            )
             
             if user_id:
                 query = query.filter_by(user_id=user_id)
@@ -468,23 +720,19 @@ class UserManager:
                 query = query.filter(UserLog.created_at <= end_time)
             
             return query.order_by(UserLog.created_at.desc()).limit(limit).all()
-        finally:
-            session.close()
     
     def clear_all_logs(self) -> bool:
         """清空所有用户日志（仅管理员）"""
-        session = self.db.get_session()
+        self._log_writer.flush()
         try:
-            session.query(UserLog).delete()
-            session.commit()
+            with self.db.session_scope() as session:
+                # Core批量删除，不同步会话中的对象
+                session.execute(delete(UserLog).execution_options(synchronize_session=False))
             logger.info("清空所有用户日志")
             return True
         except Exception as e:
-            session.rollback()
             logger.error(f"清空日志失败: {e}")
             return False
-        finally:
-            session.close()
     
     # ==================== 初始化相关 ====================
     
@@ -496,10 +744,11 @@ class UserManager:
         Returns:
             是否创建了新管理员
         """
-        session = self.db.get_session()
         try:
-            admin = session.query(User).filter_by(username='admin').first()
-            if not admin:
+            with self.db.session_scope() as session:
+                admin = session.query(User).filter_by(username='admin').first()
+                if admin:
+                    return False
                 # 创建默认管理员
                 admin = User(
                     username='admin',
@@ -508,32 +757,27 @@ class UserManager:
                     is_active=True
                 )
                 session.add(admin)
-                session.commit()
-                logger.info("创建默认管理员账号: admin/admin123")
-                return True
-            return False
+            logger.info("创建默认管理员账号: admin/admin123")
+            return True
         except Exception as e:
-            session.rollback()
             logger.error(f"初始化管理员失败: {e}")
             return False
-        finally:
-            session.close()
     
     def get_user_statistics(self) -> Dict[str, Any]:
         """获取用户统计信息"""
-        session = self.db.get_session()
-        try:
-            total_users = session.query(User).count()
-            active_users = session.query(User).filter_by(is_active=True).count()
-            admin_count = session.query(User).filter_by(role='admin').count()
-            total_logs = session.query(UserLog).count()
+        self._log_writer.flush()
+        with self.db.session_scope() as session:
+            # 用户相关计数合并为一次聚合查询
+            total_users, active_users, admin_count = session.query(
+                func.count(User.id),
+                func.sum(case((User.is_active == True, 1), else_=0)),
+                func.sum(case((User.role == 'admin', 1), else_=0))
+            ).one()
+            total_logs = session.query(func.count(UserLog.id)).scalar()
             
             return {
                 'total_users': total_users,
-                'active_users': active_users,
-                'admin_count': admin_count,
+                'active_users': active_users or 0,
+                'admin_count': admin_count or 0,
                 'total_logs': total_logs
             }
-        finally:
-            session.close()
-
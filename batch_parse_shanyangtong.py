@@ -13,18 +13,12 @@
 
 import sys
 import time
+import asyncio
 from pathlib import Path
 from collections import defaultdict
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).resolve().parent
-sys.path.insert(0, str(PROJECT_ROOT))
-
-from backend.config import config
-from backend.db_manager import DatabaseManager
-from backend.pdf_parser import PDFParser
-from backend.ai_processor import AIProcessor
-from backend.data_writer import DataWriter
 
 # 尚阳通规格书目录（项目根下）
 PDF_DIR = PROJECT_ROOT / "尚阳通规格书"
@@ -32,8 +26,74 @@ PDF_DIR = PROJECT_ROOT / "尚阳通规格书"
 # 三份表格对应的器件类型（与系统一致）
 DEVICE_TYPES = ["Si MOSFET", "SiC MOSFET", "IGBT"]
 
+# 进度输出最小间隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+
+async def _parse_and_extract(pdf_parser, ai_processor, params_info, max_concurrent,
+                             on_parse_progress, on_extract_progress):
+    """
+    流水线执行解析与AI提取：解析在后台线程中逐个产出，
+    每解析完一个 PDF 就送入队列，由 max_concurrent 个协程并发做 AI 提取，
+    总耗时趋近 max(解析, 提取) 而非两者之和
+
+    Returns:
+        (PDF解析结果列表, AI提取结果列表, 解析耗时)，均按文件顺序
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    pdf_contents = []
+    start = time.time()
+
+    def produce():
+        try:
+            for content in pdf_parser.iter_parse(
+                str(PDF_DIR),
+                progress_callback=on_parse_progress,
+                use_cache=True,
+            ):
+                pdf_contents.append(content)
+                if not content.error:
+                    loop.call_soon_threadsafe(queue.put_nowait, (len(pdf_contents) - 1, content))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+        return time.time() - start
+
+    results = []
+    completed = 0
+
+    async def consume():
+        nonlocal completed
+        while True:
+            item = await queue.get()
+            if item is None:
+                # 结束标记放回，通知其他消费者
+                queue.put_nowait(None)
+                return
+            idx, content = item
+            result = await ai_processor.extract_params_async(content, params_info)
+            results.append((idx, result))
+            completed += 1
+            on_extract_progress(completed, content.file_name)
+
+    producer = loop.run_in_executor(None, produce)
+    await asyncio.gather(*(consume() for _ in range(max(1, max_concurrent))))
+    parse_elapsed = await producer
+
+    results.sort(key=lambda item: item[0])
+    return pdf_contents, [r for _, r in results], parse_elapsed
+
 
 def main():
+    # 后端模块（SQLAlchemy模型、PDF/AI依赖）较重，仅在实际运行时导入，import 本脚本不付出该开销
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    from backend.config import config
+    from backend.db_manager import DatabaseManager
+    from backend.pdf_parser import PDFParser
+    from backend.ai_processor import AIProcessor
+    from backend.data_writer import DataWriter
+
     print("=" * 60)
     print("  尚阳通规格书 · 后端批量解析并生成三份表格")
     print("=" * 60)
@@ -58,20 +118,43 @@ def main():
         return 1
     print(f"\n✓ 参数库: {len(params_info)} 个标准参数")
 
-    # ---------- 阶段 1：批量解析 PDF（带缓存） ----------
-    print("\n[1/3] 批量解析 PDF（含 MD5 缓存）...")
-    start_parse = time.time()
+    # ---------- 阶段 1+2：批量解析 PDF（带缓存）并流水线 AI 提取 ----------
+    print("\n[1-2/3] 批量解析 PDF（含 MD5 缓存），解析完一个即开始 AI 参数提取...")
+    start_pipeline = time.time()
+    progress = {"parsed": 0, "total": 0, "extracted": 0, "last_print": 0.0}
+
+    def show_progress(name, force=False):
+        # 限制刷新频率（每秒最多10次），避免每个文件一次终端输出
+        now = time.monotonic()
+        if not force and now - progress["last_print"] < PROGRESS_INTERVAL:
+            return
+        progress["last_print"] = now
+        print(
+            f"  解析 {progress['parsed']}/{progress['total']} | "
+            f"AI 提取 {progress['extracted']} - {name or ''}",
+            end="\r",
+        )
 
     def on_parse_progress(idx, total, name, status):
         if total:
-            print(f"  解析进度: {idx + 1}/{total} - {name or ''}", end="\r")
+            progress["parsed"] = min(idx + 1, total)
+            progress["total"] = total
+            show_progress(name, force=status == "completed")
+
+    def on_extract_progress(completed, pdf_name):
+        progress["extracted"] = completed
+        show_progress(pdf_name)
 
-    pdf_contents = pdf_parser.batch_parse(
-        str(PDF_DIR),
-        progress_callback=on_parse_progress,
-        use_cache=True,
-    )
-    parse_elapsed = time.time() - start_parse
+    pdf_contents, results, parse_elapsed = asyncio.run(_parse_and_extract(
+        pdf_parser,
+        ai_processor,
+        params_info,
+        config.parser.max_workers,
+        on_parse_progress,
+        on_extract_progress,
+    ))
+    pipeline_elapsed = time.time() - start_pipeline
+    show_progress("", force=True)
 
     pdf_ok = [c for c in pdf_contents if not c.error]
     parse_failed = len(pdf_contents) - len(pdf_ok)
@@ -81,24 +164,8 @@ def main():
         print("\n❌ 没有可用的 PDF 内容，无法继续。")
         return 1
 
-    # ---------- 阶段 2：AI 批量提取并写入数据库 ----------
-    print("\n[2/3] AI 参数提取并写入数据库...")
-    start_extract = time.time()
-
-    def on_extract_progress(completed, total, pdf_name):
-        if total:
-            print(f"  AI 提取: {completed}/{total} - {pdf_name or ''}", end="\r")
-
-    results = ai_processor.batch_extract(
-        pdf_ok,
-        params_info,
-        max_concurrent=config.parser.max_workers,
-        progress_callback=on_extract_progress,
-    )
-    extract_elapsed = time.time() - start_extract
-
     success_count = sum(1 for r in results if not r.error)
-    print(f"\n✓ 提取完成: 成功 {success_count}/{len(results)}，耗时 {extract_elapsed:.1f}s")
+    print(f"✓ 提取完成: 成功 {success_count}/{len(results)}，总耗时 {pipeline_elapsed:.1f}s")
 
     data_writer.write_to_database(results, user_id=None)
     print("✓ 结果已写入数据库（user_id=None）")
@@ -110,19 +177,21 @@ def main():
         if r.error:
             continue
         dtype = r.device_type or "Si MOSFET"
-        by_type[dtype].append(r.pdf_name)
+        by_type[dtype].append(r)
 
     generated = []
     for device_type in DEVICE_TYPES:
-        pdf_list = by_type.get(device_type, [])
-        if not pdf_list:
+        type_results = by_type.get(device_type, [])
+        if not type_results:
             print(f"  跳过 {device_type}: 无该类型解析结果")
             continue
+        # 直接使用刚写入数据库的提取结果生成表格，不再回读数据库
         out = data_writer.generate_table_by_conditions(
             device_type,
-            pdf_list,
+            [r.pdf_name for r in type_results],
             created_by="batch_parse_shanyangtong",
             user_id=None,
+            preloaded_results=type_results,
         )
         if out.get("success"):
             generated.append((device_type, out["file_path"], out["pdf_count"]))
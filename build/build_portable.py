@@ -13,12 +13,18 @@
 """
 
 import os
+import re
+import json
+import hashlib
 import sys
 import shutil
 import zipfile
+import zlib
 import urllib.request
 import subprocess
+import tempfile
 import fnmatch
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Windows 控制台默认 cp1252，无法打印中文，强制使用 UTF-8 避免 UnicodeEncodeError
@@ -35,6 +41,8 @@ PYTHON_EMBED_URL = f"https://www.python.org/ftp/python/{PYTHON_VERSION}/python-{
 GET_PIP_URL = "https://bootstrap.pypa.io/get-pip.py"
 OUTPUT_NAME = "功率器件参数提取系统_便携版"
 OUTPUT_ZIP = f"{OUTPUT_NAME}.zip"
+# 下载缓存目录（Python 嵌入包、get-pip.py），跨构建复用
+DOWNLOAD_CACHE_DIR = Path.home() / ".cache" / "altool-build"
 
 # 项目根目录（build 的上一级）
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -90,6 +98,37 @@ EXCLUDE_PATTERNS = [
     "params.db",  # 用户数据，不打包
 ]
 
+
+def _is_suffix_pattern(pattern: str) -> bool:
+    """形如 *.pyc 的纯后缀模式（除开头的 * 外不含其他通配符）"""
+    return pattern.startswith("*") and not any(c in pattern[1:] for c in "*?[")
+
+
+def _compile_exclude_patterns(patterns):
+    """
+    将 EXCLUDE_PATTERNS 预先分桶并编译（模块加载时执行一次）：
+    - 后缀元组：纯后缀模式（*.pyc、*.log 等），用 str.endswith 判断，不进正则
+    - 文件名正则：其余带通配符的模式，匹配文件名
+    - 相对路径正则：带通配符的非后缀模式匹配整个相对路径；普通名称按路径段匹配
+    Windows 上 fnmatch 不区分大小写，通配符部分保持一致
+    """
+    glob_flags = "(?i:{})" if os.path.normcase("A") == "a" else "(?:{})"
+    suffixes, name_parts, path_parts = [], [], []
+    for pattern in patterns:
+        if _is_suffix_pattern(pattern):
+            suffixes.append(os.path.normcase(pattern[1:]))
+        elif "*" in pattern:
+            name_parts.append(glob_flags.format(fnmatch.translate(pattern)))
+            if not pattern.startswith("*"):
+                path_parts.append(r"\A" + glob_flags.format(fnmatch.translate(pattern)))
+        else:
+            path_parts.append(r"(?:^|/)" + re.escape(pattern) + r"(?:/|\Z)")
+    never = r"(?!)"
+    return tuple(suffixes), re.compile("|".join(name_parts) or never), re.compile("|".join(path_parts) or never)
+
+
+_EXCLUDE_SUFFIXES, _EXCLUDE_NAME_RE, _EXCLUDE_PATH_RE = _compile_exclude_patterns(EXCLUDE_PATTERNS)
+
 # 需要创建的空目录
 EMPTY_DIRS = ["data", "logs", "output", "cache", "backup"]
 
@@ -105,8 +144,9 @@ def download_file(url: str, dest: Path, retries: int = 3) -> bool:
     for attempt in range(1, retries + 1):
         try:
             log(f"下载: {url} (尝试 {attempt}/{retries})")
-            with urllib.request.urlopen(req, timeout=120) as resp:
-                dest.write_bytes(resp.read())
+            # 分块流式写盘，内存占用恒定，网络读取与磁盘写入交替进行
+            with urllib.request.urlopen(req, timeout=120) as resp, open(dest, "wb") as f:
+                shutil.copyfileobj(resp, f, 1 << 20)
             if dest.exists() and dest.stat().st_size > 0:
                 return True
         except Exception as e:
@@ -116,6 +156,56 @@ def download_file(url: str, dest: Path, retries: int = 3) -> bool:
     return False
 
 
+def _head(url: str):
+    """HEAD 请求获取 (ETag, Content-Length)；离线或失败时返回 None"""
+    req = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "Python-build"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.headers.get("ETag"), resp.headers.get("Content-Length")
+    except Exception as e:
+        log(f"无法校验缓存（{e}），尝试使用本地缓存")
+        return None
+
+
+def cached_download(url: str, dest: Path) -> bool:
+    """
+    带本地缓存的下载：按 URL 的 sha256 缓存到 DOWNLOAD_CACHE_DIR，旁边保存 .meta.json（ETag、Content-Length）
+    - 缓存存在且 HEAD 返回的 ETag/大小一致：直接复制缓存
+    - 离线（HEAD 失败）但缓存存在：使用缓存，支持完全离线重复打包
+    - 否则重新下载并更新缓存
+    """
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    cache_file = DOWNLOAD_CACHE_DIR / key
+    meta_file = DOWNLOAD_CACHE_DIR / f"{key}.meta.json"
+
+    meta = None
+    if cache_file.exists() and meta_file.exists():
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = None
+        # 缓存文件不完整（大小与记录不符）视为无效
+        if meta and meta.get("content_length") and int(meta["content_length"]) != cache_file.stat().st_size:
+            meta = None
+
+    remote = _head(url)
+    if meta and (remote is None or (meta.get("etag"), meta.get("content_length")) == remote):
+        log(f"使用缓存: {url}")
+        shutil.copyfile(cache_file, dest)
+        return True
+
+    DOWNLOAD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if not download_file(url, cache_file):
+        return False
+    etag, length = remote if remote is not None else (None, None)
+    meta_file.write_text(
+        json.dumps({"url": url, "etag": etag, "content_length": length}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    shutil.copyfile(cache_file, dest)
+    return True
+
+
 def extract_zip(zip_path: Path, dest: Path):
     """解压 zip"""
     log(f"解压: {zip_path.name}")
@@ -123,31 +213,68 @@ def extract_zip(zip_path: Path, dest: Path):
         zf.extractall(dest)
 
 
+def _is_excluded(name: str, rel_posix: str) -> bool:
+    """按文件名与相对路径（/ 分隔）判断是否排除，纯字符串运算"""
+    if os.path.normcase(name).endswith(_EXCLUDE_SUFFIXES):
+        return True
+    return bool(_EXCLUDE_NAME_RE.match(name) or _EXCLUDE_PATH_RE.search(rel_posix))
+
+
 def should_exclude(file_path: Path, relative_to: Path) -> bool:
     """检查文件是否应排除"""
     try:
         rel = file_path.relative_to(relative_to)
     except ValueError:
         return True
-    rel_str = str(rel).replace("\\", "/")
-    name = file_path.name
+    return _is_excluded(file_path.name, rel.as_posix())
 
-    for pattern in EXCLUDE_PATTERNS:
-        if pattern.startswith("*"):
-            if rel_str.endswith(pattern[1:]) or name.endswith(pattern[1:]):
-                return True
-        elif "*" in pattern:
-            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_str, pattern):
-                return True
-        elif pattern in rel_str or pattern == name:
-            return True
-    return False
+
+def should_exclude_dir(rel_posix: str) -> bool:
+    """检查目录（相对项目根目录，/ 分隔）是否应整体跳过，命中后 os.walk 不再进入该目录"""
+    return bool(_EXCLUDE_PATH_RE.search(rel_posix))
+
+
+if sys.platform == "win32":
+    try:
+        import ctypes
+        _CopyFileW = ctypes.windll.kernel32.CopyFileW
+    except (ImportError, AttributeError, OSError):
+        _CopyFileW = None
+else:
+    _CopyFileW = None
+
+
+def fast_copy(src, dst):
+    """
+    复制单个文件（含时间戳等元数据）
+    - Windows：CopyFileW 一次系统调用完成数据与属性复制
+    - Linux：copy_file_range 在内核内拷贝，随后 copystat
+    - 不支持的平台/文件系统回退到 shutil.copy2
+    """
+    if _CopyFileW is not None:
+        if _CopyFileW(str(src), str(dst), False):
+            return
+    elif hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 20):
+                    pass
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
 
 
 def copy_project_files(dest: Path):
-    """复制项目文件到目标目录"""
+    """复制项目文件到目标目录（先收集文件清单并统一建目录，再用线程池并行复制）"""
     log("复制项目文件...")
 
+    # 循环内只做字符串拼接，不逐文件构造 Path 对象
+    root_prefix_len = len(str(PROJECT_ROOT)) + 1
+    dest_str = str(dest)
+    pairs = []
+    dest_dirs = set()
     for item in INCLUDE_PATTERNS:
         src = PROJECT_ROOT / item
         if not src.exists():
@@ -156,23 +283,31 @@ def copy_project_files(dest: Path):
 
         if src.is_file():
             if not should_exclude(src, PROJECT_ROOT):
-                shutil.copy2(src, dest / item)
-                log(f"  复制: {item}")
+                pairs.append((str(src), os.path.join(dest_str, item)))
         else:
             # 目录
             for root, dirs, files in os.walk(src):
-                # 过滤 __pycache__
-                dirs[:] = [d for d in dirs if d != "__pycache__" and d != ".git"]
+                rel_root = root[root_prefix_len:]
+                rel_posix = rel_root.replace(os.sep, "/")
+                # 剪掉被排除的目录（__pycache__、.git、tests 等），不再遍历其子树
+                dirs[:] = [d for d in dirs if not should_exclude_dir(f"{rel_posix}/{d}")]
 
-                rel_root = Path(root).relative_to(PROJECT_ROOT)
-                dest_root = dest / rel_root
-                dest_root.mkdir(parents=True, exist_ok=True)
+                dest_root = os.path.join(dest_str, rel_root)
+                dest_dirs.add(dest_root)
 
                 for f in files:
-                    src_file = Path(root) / f
-                    if not should_exclude(src_file, PROJECT_ROOT):
-                        shutil.copy2(src_file, dest_root / f)
-                        log(f"  复制: {rel_root / f}")
+                    if not _is_excluded(f, f"{rel_posix}/{f}"):
+                        pairs.append((os.path.join(root, f), os.path.join(dest_root, f)))
+
+    # 目录在派发前一次建好，工作线程之间不会竞争 mkdir
+    for d in sorted(dest_dirs):
+        os.makedirs(d, exist_ok=True)
+
+    # 文件复制是 I/O 密集型，复制期间释放 GIL
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(lambda p: fast_copy(*p), pairs))
+    log(f"  已复制 {len(pairs)} 个文件")
 
 
 def fix_embed_pth(python_dir: Path):
@@ -190,6 +325,34 @@ def fix_embed_pth(python_dir: Path):
             log(f"已启用 site-packages: {pth_file.name}")
 
 
+def prune_site_packages(python_dir: Path):
+    """删除第三方包自带的 tests 目录（运行时不会导入），减小便携包体积"""
+    site_packages = python_dir / "Lib" / "site-packages"
+    removed = 0
+    for root, dirs, files in os.walk(site_packages):
+        for d in [d for d in dirs if d == "tests"]:
+            shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+            dirs.remove(d)
+            removed += 1
+    log(f"已清理 site-packages 中的 tests 目录: {removed} 个")
+
+
+def _text_bytes(text: str) -> bytes:
+    """与 write_text 一致的编码：换行转为平台换行符（Windows 上 .bat 需要 CRLF），UTF-8 编码"""
+    return text.replace("\n", os.linesep).encode("utf-8")
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """内容不同才写入，避免无谓的磁盘写入和杀毒软件重新扫描；返回是否写入"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
 def create_launcher_bat(dest: Path, python_exe: Path):
     """创建便携版启动脚本（桌面窗口 + 浏览器备用）"""
     # 主启动：桌面窗口（选项 C）
@@ -219,7 +382,7 @@ if %ERRORLEVEL% NEQ 0 (
     pause
 )
 '''
-    (dest / "启动.bat").write_text(desktop_bat, encoding="utf-8")
+    write_if_changed(dest / "启动.bat", _text_bytes(desktop_bat))
     log("已创建: 启动.bat（桌面窗口）")
 
     # 备用：浏览器版
@@ -253,7 +416,7 @@ if %ERRORLEVEL% NEQ 0 (
     pause
 )
 '''
-    (dest / "启动-浏览器版.bat").write_text(browser_bat, encoding="utf-8")
+    write_if_changed(dest / "启动-浏览器版.bat", _text_bytes(browser_bat))
     log("已创建: 启动-浏览器版.bat")
 
 
@@ -281,10 +444,110 @@ def create_readme(dest: Path):
 - 若端口 8501 被占用，可修改启动脚本中的端口号
 - 关闭时直接关闭程序窗口即可（桌面版会同时退出后台服务）
 """
-    readme.write_text(content, encoding="utf-8")
+    write_if_changed(readme, _text_bytes(content))
     log("已创建: 使用说明.txt")
 
 
+ZIP_COMPRESSLEVEL = 1
+ZIP_BATCH_SIZE = 64  # 每批并行压缩的文件数，限制同时存在的压缩结果
+ZIP_CHUNK_SIZE = 1 << 20  # 读取/压缩/写入的分块大小
+ZIP_SPOOL_SIZE = 1 << 20  # 单个压缩结果超过此大小时转存到临时文件
+# _write_deflated 用到的 ZipFile 内部属性
+_ZIP_INTERNALS = ("fp", "start_dir", "filelist", "NameToInfo", "_writecheck", "_didModify")
+# 本身已压缩/不可再压缩的文件后缀（小写），打包时直接存储，不走 deflate
+_STORED_EXTS = frozenset({
+    ".whl", ".pyd", ".so", ".zip", ".png", ".jpg", ".jpeg", ".gz", ".xz", ".bz2", ".zst",
+})
+
+
+def _walk_files(base: Path):
+    """基于 os.scandir 的递归遍历，产出文件的 DirEntry（跳过 __pycache__），类型判断复用目录项信息，不额外 stat"""
+    stack = [str(base)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+
+def _deflate_file(path):
+    """
+    分块读取文件并做原始 deflate 压缩，返回 (crc32, 原始大小, 压缩大小, 压缩数据缓冲)
+    压缩结果写入 SpooledTemporaryFile，小文件留在内存、大文件落盘；zlib 压缩时释放 GIL，可在线程中并行
+    """
+    compressor = zlib.compressobj(ZIP_COMPRESSLEVEL, zlib.DEFLATED, -15)
+    buf = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_SIZE)
+    crc = size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(ZIP_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            buf.write(compressor.compress(chunk))
+    buf.write(compressor.flush())
+    compress_size = buf.tell()
+    buf.seek(0)
+    return crc, size, compress_size, buf
+
+
+def _can_write_deflated(zf: zipfile.ZipFile) -> bool:
+    """_write_deflated 依赖 ZipFile 的内部属性，当前 Python 版本缺少任一项时退回 zf.write"""
+    return all(hasattr(zf, name) for name in _ZIP_INTERNALS)
+
+
+def _write_deflated(zf: zipfile.ZipFile, path, arcname: str, crc: int, size: int, compress_size: int, buf):
+    """将已压缩好的数据直接写入 zip（预先填好 CRC 与大小，主线程只做顺序写入）"""
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = compress_size
+    zip64 = size > zipfile.ZIP64_LIMIT or compress_size > zipfile.ZIP64_LIMIT
+    zf._writecheck(zinfo)
+    zf.fp.seek(zf.start_dir)
+    zinfo.header_offset = zf.fp.tell()
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+    shutil.copyfileobj(buf, zf.fp, ZIP_CHUNK_SIZE)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+    zf.start_dir = zf.fp.tell()
+
+
+def write_portable_zip(build_dir: Path, output_zip: Path):
+    """
+    将 build 目录打包为 zip
+    - 压缩级别 1：载荷以二进制为主，更高级别收益很小但 CPU 开销成倍增加
+    - 本身已压缩的文件直接存储，不再走 deflate
+    - 其余文件在线程池中并行压缩，主线程按顺序写入归档
+    """
+    prefix_len = len(str(build_dir)) + 1
+    entries = []
+    for entry in _walk_files(build_dir):
+        arcname = entry.path[prefix_len:].replace(os.sep, "/")
+        entries.append((entry.path, arcname, os.path.splitext(entry.name)[1].lower()))
+
+    with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL) as zf, \
+            ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        if not _can_write_deflated(zf):
+            for fp, arcname, suffix in entries:
+                compress_type = zipfile.ZIP_STORED if suffix in _STORED_EXTS else zipfile.ZIP_DEFLATED
+                zf.write(fp, arcname, compress_type=compress_type)
+            return
+        for start in range(0, len(entries), ZIP_BATCH_SIZE):
+            batch = entries[start:start + ZIP_BATCH_SIZE]
+            deflate = [(fp, arcname) for fp, arcname, suffix in batch if suffix not in _STORED_EXTS]
+            results = pool.map(lambda e: _deflate_file(e[0]), deflate)
+            for fp, arcname, suffix in batch:
+                if suffix in _STORED_EXTS:
+                    zf.write(fp, arcname, compress_type=zipfile.ZIP_STORED)
+            for (fp, arcname), (crc, size, compress_size, buf) in zip(deflate, results):
+                with buf:
+                    _write_deflated(zf, fp, arcname, crc, size, compress_size, buf)
+
+
 def main():
     if sys.platform != "win32":
         log("=" * 50)
@@ -305,7 +568,7 @@ def main():
     try:
         # 1. 下载 Python 嵌入式包
         python_zip = build_dir / "python_embed.zip"
-        if not download_file(PYTHON_EMBED_URL, python_zip):
+        if not cached_download(PYTHON_EMBED_URL, python_zip):
             return 1
 
         # 2. 解压 Python
@@ -321,7 +584,7 @@ def main():
 
         # 4. 安装 pip
         get_pip = build_dir / "get-pip.py"
-        if not download_file(GET_PIP_URL, get_pip):
+        if not cached_download(GET_PIP_URL, get_pip):
             return 1
 
         log("安装 pip...")
@@ -336,10 +599,12 @@ def main():
         log("安装 Python 依赖（可能需要几分钟）...")
         req_file = PROJECT_ROOT / "requirements.txt"
         subprocess.run(
-            [str(python_exe), "-m", "pip", "install", "-r", str(req_file), "--quiet", "--no-warn-script-location"],
+            [str(python_exe), "-m", "pip", "install", "-r", str(req_file),
+             "--no-compile", "--prefer-binary", "--quiet", "--no-warn-script-location"],
             cwd=str(PROJECT_ROOT),
             check=True,
         )
+        prune_site_packages(python_dir)
 
         # 6. 复制项目文件到 build 目录（与 python 同级）
         copy_project_files(build_dir)
@@ -355,13 +620,7 @@ def main():
         # 9. 打包成 zip
         output_zip = PROJECT_ROOT / OUTPUT_ZIP
         log(f"正在压缩: {output_zip.name}")
-        with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as zf:
-            for root, dirs, files in os.walk(build_dir):
-                dirs[:] = [d for d in dirs if d != "__pycache__"]
-                for f in files:
-                    fp = Path(root) / f
-                    arcname = fp.relative_to(build_dir)
-                    zf.write(fp, arcname)
+        write_portable_zip(build_dir, output_zip)
 
         # 10. 清理
         shutil.rmtree(build_dir)
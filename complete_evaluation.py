@@ -2,22 +2,80 @@
 # -*- coding: utf-8 -*-
 """完整版参数提取评估 - 验证所有参数"""
 
+import hashlib
+import io
 import json
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
 from backend.pdf_parser import PDFParser
 
+# PDF 解析结果的磁盘缓存目录
+EVAL_CACHE_DIR = Path('./cache/eval')
+# 解析结果格式版本，extract_all_pdf_params 输出变化时递增，旧缓存自动失效
+EVAL_CACHE_VERSION = 2
+
+_NUM_RE = re.compile(r'[-+]?\d*\.?\d+')
+_WS_RE = re.compile(r'\s+')
+
+
 def normalize_value(val):
     """标准化值用于比较"""
     if val is None:
         return None
-    val = str(val).strip()
-    val = re.sub(r'\s+', ' ', val)
+    return _normalize_str(str(val))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_str(val: str):
+    """normalize_value 的缓存实现（同一取值在各 PDF 间大量重复）"""
+    val = val.strip()
+    # 只有连续空白或非空格空白字符（\t、\n、全角空格等，均不可打印）时才需要替换
+    if '  ' in val or not val.isprintable():
+        val = _WS_RE.sub(' ', val)
     # 提取数值
-    match = re.search(r'[-+]?\d*\.?\d+', val)
+    match = _NUM_RE.search(val)
     if match:
         return match.group()
     return val
 
+# 表头别名（小写表头 -> 列角色），精确命中时一次字典查找即可
+HEADER_ALIASES = {
+    'symbol': 'symbol', '符号': 'symbol', 'parameter': 'symbol',
+    'min': 'min', 'min.': 'min', 'minimum': 'min',
+    'typ': 'typ', 'typ.': 'typ', 'typical': 'typ',
+    'max': 'max', 'max.': 'max', 'maximum': 'max',
+    'unit': 'unit', 'units': 'unit', '单位': 'unit',
+}
+# 未精确命中时的子串规则，按顺序判定（符号列优先于单位列）
+SUBSTR_ROLES = [
+    ('symbol', 'symbol'), ('符号', 'symbol'), ('parameter', 'symbol'),
+    ('unit', 'unit'), ('单位', 'unit'),
+]
+# 表头中没有符号列时使用的严格表头名
+STRICT_HEADER_ALIASES = {
+    'min': 'min', 'min.': 'min',
+    'typ': 'typ', 'typ.': 'typ',
+    'max': 'max', 'max.': 'max',
+    'unit': 'unit', 'units': 'unit', '单位': 'unit',
+}
+# 数据行中不是参数符号的单元格（重复表头、占位符）
+_SKIP_SYMBOLS = frozenset({'Symbol', 'Parameter', '参数', '符号', '-', '–'})
+# 表示无值的单元格
+_NULLS = frozenset({'-', '–', '', 'None'})
+
+
+def _clean(v):
+    """单元格取值：空值/占位符返回 None，否则返回去空白后的字符串"""
+    if not v:
+        return None
+    s = str(v).strip()
+    return None if s in _NULLS else s
+
+
 def extract_all_pdf_params(pdf_path: str) -> dict:
     """从PDF表格中提取所有参数"""
     parser = PDFParser()
@@ -33,68 +91,103 @@ def extract_all_pdf_params(pdf_path: str) -> dict:
         header = table[0]
         header_lower = [str(h).lower().strip() for h in header]
         
-        # 找各列索引
-        symbol_idx = None
-        min_idx = None
-        typ_idx = None
-        max_idx = None
-        unit_idx = None
-        
+        # 找各列索引（单次扫描：先查精确别名，再按子串规则判定）
+        idx = {}
+        strict_idx = {}
         for i, h in enumerate(header_lower):
-            if 'symbol' in h or '符号' in h or 'parameter' in h or h == 'symbol':
-                symbol_idx = i
-            elif h in ['min', 'min.', 'minimum']:
-                min_idx = i
-            elif h in ['typ', 'typ.', 'typical']:
-                typ_idx = i
-            elif h in ['max', 'max.', 'maximum']:
-                max_idx = i
-            elif 'unit' in h or '单位' in h:
-                unit_idx = i
+            role = HEADER_ALIASES.get(h) or next((r for sub, r in SUBSTR_ROLES if sub in h), None)
+            if role:
+                idx[role] = i
+            strict_role = STRICT_HEADER_ALIASES.get(h)
+            if strict_role:
+                strict_idx[strict_role] = i
         
+        symbol_idx = idx.get('symbol')
         if symbol_idx is None:
-            # 尝试用第一列作为符号
+            # 尝试用第一列作为符号，其余列按严格表头名覆盖
             symbol_idx = 0
-            for i, h in enumerate(header_lower):
-                if h in ['min', 'min.']:
-                    min_idx = i
-                elif h in ['typ', 'typ.']:
-                    typ_idx = i
-                elif h in ['max', 'max.']:
-                    max_idx = i
-                elif h in ['unit', 'units', '单位']:
-                    unit_idx = i
+            idx.update(strict_idx)
+        # 未找到的列记为 -1；第 0 列保留给符号，不作为取值列（下方统一用 0 < idx 判断）
+        min_idx = idx.get('min', -1)
+        typ_idx = idx.get('typ', -1)
+        max_idx = idx.get('max', -1)
+        unit_idx = idx.get('unit', -1)
+        # 没有任何取值列（目录、法律声明、页脚等非规格表）：只会产生全空条目，整表跳过
+        if max(min_idx, typ_idx, max_idx, unit_idx) <= 0:
+            continue
         
         # 提取数据行
         for row in table[1:]:
-            if len(row) <= symbol_idx:
+            n = len(row)
+            if n <= symbol_idx:
                 continue
             
             symbol = str(row[symbol_idx]).strip()
             # 清理多行符号
             symbol = symbol.replace('\n', '').replace(' ', '')
             
-            if not symbol or symbol in ['Symbol', 'Parameter', '参数', '符号', '-', '–']:
+            if not symbol or symbol in _SKIP_SYMBOLS:
                 continue
             
-            # 提取min/typ/max值
-            val_min = row[min_idx] if min_idx and len(row) > min_idx else None
-            val_typ = row[typ_idx] if typ_idx and len(row) > typ_idx else None
-            val_max = row[max_idx] if max_idx and len(row) > max_idx else None
-            unit = row[unit_idx] if unit_idx and len(row) > unit_idx else ''
-            
-            # 存储
-            if symbol:
-                params[symbol] = {
-                    'min': str(val_min).strip() if val_min and str(val_min).strip() not in ['-', '–', '', 'None'] else None,
-                    'typ': str(val_typ).strip() if val_typ and str(val_typ).strip() not in ['-', '–', '', 'None'] else None,
-                    'max': str(val_max).strip() if val_max and str(val_max).strip() not in ['-', '–', '', 'None'] else None,
-                    'unit': str(unit).strip() if unit else ''
-                }
+            # 提取min/typ/max值并存储
+            unit = row[unit_idx] if 0 < unit_idx < n else None
+            params[symbol] = {
+                'min': _clean(row[min_idx]) if 0 < min_idx < n else None,
+                'typ': _clean(row[typ_idx]) if 0 < typ_idx < n else None,
+                'max': _clean(row[max_idx]) if 0 < max_idx < n else None,
+                'unit': str(unit).strip() if unit else ''
+            }
+    
+    return params
+
+
+def cached_extract_all_pdf_params(pdf_path: str) -> dict:
+    """
+    带磁盘缓存的 extract_all_pdf_params
+    缓存文件 cache/eval/<sha1(前64KB)>.json，同时记录缓存版本、文件大小与 mtime，任一变化即重新解析
+    """
+    st = os.stat(pdf_path)
+    with open(pdf_path, 'rb') as f:
+        key = hashlib.sha1(f.read(1 << 16)).hexdigest()
+    cache_file = EVAL_CACHE_DIR / f'{key}.json'
+    
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if (cached.get('version') == EVAL_CACHE_VERSION
+                and cached.get('size') == st.st_size and cached.get('mtime_ns') == st.st_mtime_ns):
+            return cached['params']
+    except (OSError, ValueError, KeyError):
+        pass
     
+    params = extract_all_pdf_params(pdf_path)
+    try:
+        EVAL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，多个进程同时写入时不会读到半截 JSON
+        tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': EVAL_CACHE_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'params': params}, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
     return params
 
 
+def _safe_extract_all_pdf_params(pdf_path: str):
+    """进程池任务：返回 (参数字典, 错误信息)，单个 PDF 失败不影响其他文件"""
+    try:
+        return cached_extract_all_pdf_params(pdf_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+# 元信息参数（不需要验证）
+META_PARAMS = frozenset({
+    'PDF文件名', '厂家', 'OPN', '厂家封装名', '技术', '封装',
+    '特殊功能', '极性', 'Product Status', '认证', '安装', 'ESD',
+    '预算价格€/1k', '工作温度min', '工作温度max',
+})
+
 # 完整的参数映射（AI参数名 -> PDF符号列表）
 COMPLETE_MAPPING = {
     # 电压参数
@@ -158,6 +251,29 @@ COMPLETE_MAPPING = {
 }
 
 
+def find_pdf_symbol(sym: str, pdf_params: dict, pdf_lower_items: list):
+    """查找候选符号对应的PDF符号：先直接匹配，再按PDF符号顺序做双向子串模糊匹配"""
+    if sym in pdf_params:
+        return sym
+    sym_lower = sym.lower()
+    return next((ps for ps_lower, ps in pdf_lower_items if sym_lower in ps_lower or ps_lower in sym_lower), None)
+
+
+def pick_pdf_value(p: dict, typ_field, max_field):
+    """按映射指定的字段从PDF参数中取值"""
+    if typ_field == 'typ' and p.get('typ'):
+        return p['typ']
+    elif typ_field == 'min' and p.get('min'):
+        return p['min']
+    elif max_field == 'max' and p.get('max'):
+        return p['max']
+    elif p.get('typ'):
+        return p['typ']
+    elif p.get('max'):
+        return p['max']
+    return None
+
+
 def evaluate_complete():
     """完整验证所有参数"""
     
@@ -166,9 +282,18 @@ def evaluate_complete():
     
     pdf_dir = './PDF/功率器件'
     
-    print('='*100)
-    print('📊 完整参数提取评估报告')
-    print('='*100)
+    # 报告先写入内存缓冲，每个 PDF 结束时一次性输出，避免逐行 print 的控制台 I/O 开销
+    buf = io.StringIO()
+    emit = partial(print, file=buf)
+    
+    def flush_report():
+        sys.stdout.write(buf.getvalue())
+        buf.seek(0)
+        buf.truncate()
+    
+    emit('='*100)
+    emit('📊 完整参数提取评估报告')
+    emit('='*100)
     
     total_stats = {
         'total_ai_params': 0,
@@ -180,24 +305,24 @@ def evaluate_complete():
         'not_in_pdf': 0
     }
     
-    # 元信息参数（不需要验证）
-    META_PARAMS = ['PDF文件名', '厂家', 'OPN', '厂家封装名', '技术', '封装', 
-                  '特殊功能', '极性', 'Product Status', '认证', '安装', 'ESD',
-                  '预算价格€/1k', '工作温度min', '工作温度max']
+    # PDF 解析是 CPU 密集型且各文件相互独立，先用进程池并行解析；
+    # 报告循环按原顺序消费结果，只做廉价的匹配工作，输出保持确定
+    flush_report()
+    pdf_paths = [f'{pdf_dir}/{result["pdf_name"]}' for result in results]
+    with ProcessPoolExecutor() as executor:
+        parsed = list(executor.map(_safe_extract_all_pdf_params, pdf_paths))
     
-    for result in results:
+    for result, (pdf_params, error) in zip(results, parsed):
         pdf_name = result['pdf_name']
-        pdf_path = f'{pdf_dir}/{pdf_name}'
         
-        print(f'\n{"="*100}')
-        print(f'📄 {pdf_name}')
-        print('='*100)
+        emit(f'\n{"="*100}')
+        emit(f'📄 {pdf_name}')
+        emit('='*100)
         
-        # 提取PDF参数
-        try:
-            pdf_params = extract_all_pdf_params(pdf_path)
-        except Exception as e:
-            print(f'  ⚠️ PDF解析失败: {e}')
+        # PDF参数已在进程池中预先解析
+        if error is not None:
+            emit(f'  ⚠️ PDF解析失败: {error}')
+            flush_report()
             continue
         
         # AI提取的参数
@@ -207,13 +332,17 @@ def evaluate_complete():
         meta_count = sum(1 for name in ai_params if name in META_PARAMS)
         spec_count = total_ai - meta_count
         
-        print(f'\n  AI提取: {total_ai}个参数 (元信息: {meta_count}, 规格参数: {spec_count})')
-        print(f'  PDF中找到: {len(pdf_params)}个符号')
+        emit(f'\n  AI提取: {total_ai}个参数 (元信息: {meta_count}, 规格参数: {spec_count})')
+        emit(f'  PDF中找到: {len(pdf_params)}个符号')
         
         stats = {'correct': 0, 'wrong': 0, 'verifiable': 0, 'not_in_pdf': 0}
         
-        print(f'\n  {"AI参数":<25} {"AI值":<20} {"PDF符号":<15} {"PDF值":<20} {"状态":<10}')
-        print('  ' + '-'*90)
+        # 每个 PDF 只构建一次小写索引；同一候选符号的匹配结果在本 PDF 内复用
+        pdf_lower_items = [(ps.lower(), ps) for ps in pdf_params]
+        sym_matches = {}
+        
+        emit(f'\n  {"AI参数":<25} {"AI值":<20} {"PDF符号":<15} {"PDF值":<20} {"状态":<10}')
+        emit('  ' + '-'*90)
         
         for ai_name, ai_value in ai_params.items():
             if ai_name in META_PARAMS:
@@ -228,42 +357,13 @@ def evaluate_complete():
                 symbols, typ_field, max_field = COMPLETE_MAPPING[ai_name]
                 
                 for sym in symbols:
-                    # 直接匹配
-                    if sym in pdf_params:
-                        pdf_symbol = sym
-                        p = pdf_params[sym]
-                        if typ_field == 'typ' and p.get('typ'):
-                            pdf_value = p['typ']
-                        elif typ_field == 'min' and p.get('min'):
-                            pdf_value = p['min']
-                        elif max_field == 'max' and p.get('max'):
-                            pdf_value = p['max']
-                        elif p.get('typ'):
-                            pdf_value = p['typ']
-                        elif p.get('max'):
-                            pdf_value = p['max']
+                    if sym not in sym_matches:
+                        sym_matches[sym] = find_pdf_symbol(sym, pdf_params, pdf_lower_items)
+                    pdf_symbol = sym_matches[sym]
+                    if pdf_symbol is not None:
+                        pdf_value = pick_pdf_value(pdf_params[pdf_symbol], typ_field, max_field)
                         found = True
                         break
-                    
-                    # 模糊匹配
-                    for ps in pdf_params:
-                        if sym.lower() in ps.lower() or ps.lower() in sym.lower():
-                            pdf_symbol = ps
-                            p = pdf_params[ps]
-                            if typ_field == 'typ' and p.get('typ'):
-                                pdf_value = p['typ']
-                            elif typ_field == 'min' and p.get('min'):
-                                pdf_value = p['min']
-                            elif max_field == 'max' and p.get('max'):
-                                pdf_value = p['max']
-                            elif p.get('typ'):
-                                pdf_value = p['typ']
-                            elif p.get('max'):
-                                pdf_value = p['max']
-                            found = True
-                            break
-                    if found:
-                        break
             
             if found and pdf_value:
                 stats['verifiable'] += 1
@@ -277,20 +377,20 @@ def evaluate_complete():
                     status = '❌ 错误'
                     stats['wrong'] += 1
                 
-                print(f'  {ai_name:<25} {str(ai_value)[:18]:<20} {pdf_symbol:<15} {str(pdf_value)[:18]:<20} {status}')
+                emit(f'  {ai_name:<25} {str(ai_value)[:18]:<20} {pdf_symbol:<15} {str(pdf_value)[:18]:<20} {status}')
             else:
                 stats['not_in_pdf'] += 1
         
-        print(f'\n  📊 规格参数统计:')
-        print(f'     规格参数总数: {spec_count}')
-        print(f'     可验证: {stats["verifiable"]} (在PDF表格中找到对应)')
-        print(f'     ✅ 正确: {stats["correct"]}')
-        print(f'     ❌ 错误: {stats["wrong"]}')
-        print(f'     ⚠️ 无法验证: {stats["not_in_pdf"]} (PDF中无对应符号)')
+        emit(f'\n  📊 规格参数统计:')
+        emit(f'     规格参数总数: {spec_count}')
+        emit(f'     可验证: {stats["verifiable"]} (在PDF表格中找到对应)')
+        emit(f'     ✅ 正确: {stats["correct"]}')
+        emit(f'     ❌ 错误: {stats["wrong"]}')
+        emit(f'     ⚠️ 无法验证: {stats["not_in_pdf"]} (PDF中无对应符号)')
         
         if stats['verifiable'] > 0:
             acc = stats['correct'] / stats['verifiable'] * 100
-            print(f'\n     🎯 可验证参数准确率: {stats["correct"]}/{stats["verifiable"]} = {acc:.1f}%')
+            emit(f'\n     🎯 可验证参数准确率: {stats["correct"]}/{stats["verifiable"]} = {acc:.1f}%')
         
         # 累计
         total_stats['total_ai_params'] += total_ai
@@ -300,12 +400,13 @@ def evaluate_complete():
         total_stats['correct'] += stats['correct']
         total_stats['wrong'] += stats['wrong']
         total_stats['not_in_pdf'] += stats['not_in_pdf']
+        flush_report()
     
     # 总体统计
-    print(f'\n{"="*100}')
-    print('📈 总体统计')
-    print('='*100)
-    print(f'''
+    emit(f'\n{"="*100}')
+    emit('📈 总体统计')
+    emit('='*100)
+    emit(f'''
   AI提取参数总数: {total_stats['total_ai_params']}
   ├── 元信息参数: {total_stats['meta_params']} (厂家、OPN、封装等，不需验证)
   └── 规格参数: {total_stats['spec_params']}
@@ -317,9 +418,12 @@ def evaluate_complete():
     
     if total_stats['verifiable'] > 0:
         acc = total_stats['correct'] / total_stats['verifiable'] * 100
-        print(f'  ╔══════════════════════════════════════════╗')
-        print(f'  ║  🎯 规格参数准确率: {total_stats["correct"]}/{total_stats["verifiable"]} = {acc:.1f}%     ║')
-        print(f'  ╚══════════════════════════════════════════╝')
+        emit(f'  ╔══════════════════════════════════════════╗')
+        emit(f'  ║  🎯 规格参数准确率: {total_stats["correct"]}/{total_stats["verifiable"]} = {acc:.1f}%     ║')
+        emit(f'  ╚══════════════════════════════════════════╝')
+    
+    flush_report()
+    sys.stdout.flush()
 
 
 if __name__ == '__main__':
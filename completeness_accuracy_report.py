@@ -9,19 +9,33 @@ import json
 import re
 import pdfplumber
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Set
+
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'[-+]?[\d.]+')
 
 def clean_text(text: str) -> str:
     """清理文本"""
     if not text:
         return ""
-    return re.sub(r'\s+', '', str(text)).lower()
+    return _clean_str(str(text))
+
+@lru_cache(maxsize=4096)
+def _clean_str(text: str) -> str:
+    """clean_text 的缓存实现（单位、数值等取值高度重复）"""
+    return _WS_RE.sub('', text).lower()
 
 def extract_number(val: str) -> str:
     """提取数值"""
     if not val:
         return ""
-    match = re.search(r'[-+]?[\d.]+', str(val))
+    return _extract_number_str(str(val))
+
+@lru_cache(maxsize=4096)
+def _extract_number_str(val: str) -> str:
+    """extract_number 的缓存实现"""
+    match = _NUM_RE.search(val)
     return match.group(0) if match else ""
 
 def extract_pdf_params(pdf_path: str) -> Dict[str, Dict]:
@@ -93,7 +107,7 @@ def extract_pdf_params(pdf_path: str) -> Dict[str, Dict]:
                         symbol = get_val('symbol')
                         if symbol:
                             # 清理符号中的换行
-                            symbol = re.sub(r'\s+', '', symbol)
+                            symbol = _WS_RE.sub('', symbol)
                         
                         if not symbol:
                             continue
@@ -119,20 +133,27 @@ def extract_pdf_params(pdf_path: str) -> Dict[str, Dict]:
     
     return params
 
-def values_match(extracted: str, pdf_val: str) -> bool:
-    """判断两个值是否匹配"""
-    if not extracted or not pdf_val:
+def value_key(val: str) -> Optional[Tuple[str, str]]:
+    """值的比较键 (数值, 清理后文本)；空值返回 None"""
+    if not val:
+        return None
+    return extract_number(val), clean_text(val)
+
+def keys_match(ext_key: Optional[Tuple[str, str]], pdf_key: Optional[Tuple[str, str]]) -> bool:
+    """按比较键判断两个值是否匹配"""
+    if not ext_key or not pdf_key:
         return False
     
     # 提取数值对比
-    ext_num = extract_number(extracted)
-    pdf_num = extract_number(pdf_val)
-    
-    if ext_num and pdf_num:
-        return ext_num == pdf_num
+    if ext_key[0] and pdf_key[0]:
+        return ext_key[0] == pdf_key[0]
     
     # 文本对比（忽略空格和大小写）
-    return clean_text(extracted) == clean_text(pdf_val)
+    return ext_key[1] == pdf_key[1]
+
+def values_match(extracted: str, pdf_val: str) -> bool:
+    """判断两个值是否匹配"""
+    return keys_match(value_key(extracted), value_key(pdf_val))
 
 # 标准参数名到PDF符号的映射
 PARAM_TO_SYMBOL = {
@@ -233,6 +254,9 @@ def main():
         
         checked_ai_params = set()
         
+        # AI 值的比较键只算一次，不随 PDF 符号重复标准化
+        ai_keys = {k: value_key(v) for k, v in comparable_ai_params.items()}
+        
         for symbol, pdf_data in pdf_params.items():
             # 确定PDF中的值（优先typ，其次max）
             pdf_value = pdf_data.get('typ') or pdf_data.get('max') or pdf_data.get('min')
@@ -247,6 +271,7 @@ def main():
             
             # 查找对应的AI参数
             found = False
+            pdf_key = value_key(pdf_value)
             for ai_name, ai_value in comparable_ai_params.items():
                 # 检查是否匹配
                 possible_symbols = PARAM_TO_SYMBOL.get(ai_name, [ai_name])
@@ -261,7 +286,7 @@ def main():
                     checked_ai_params.add(ai_name)
                     
                     # 检查值是否匹配
-                    if values_match(ai_value, pdf_value):
+                    if keys_match(ai_keys[ai_name], pdf_key):
                         stats['matched'] += 1
                         matched_list.append((symbol, pdf_value_with_unit, ai_name, ai_value))
                         status = "✅ 正确"
@@ -9,6 +9,14 @@ import re
 import pdfplumber
 from pathlib import Path
 
+# 预编译正则（真实值提取与数值标准化）
+_WS_RE = re.compile(r'\s+')
+_VDS_RE = re.compile(r'VD[S]?S?\s+(\d+)\s*V')
+_RDS_TYP_RE = re.compile(r'RDS\(on\)[^\d]*typ[^\d]*([\d.]+)\s*mΩ', re.IGNORECASE)
+_RDS_ALT_RE = re.compile(r'VGS\s*=\s*10V[^\d]*([\d.]+)\s+([\d.]+)')
+_CISS_RE = re.compile(r'Ciss[^\d]*([\d]+)\s*pF', re.IGNORECASE)
+_QG_RE = re.compile(r'Qg[^\d]*([\d.]+)\s*nC')
+
 # 加载测试结果
 with open('test_results.json', 'r', encoding='utf-8') as f:
     results = json.load(f)
@@ -27,24 +35,24 @@ def extract_ground_truth(pdf_path):
                     full_text += text + "\n"
             
             # 提取VDS
-            vds_match = re.search(r'VD[S]?S?\s+(\d+)\s*V', full_text)
+            vds_match = _VDS_RE.search(full_text)
             if vds_match:
                 truth['VDS'] = vds_match.group(1) + ' V'
             
             # 提取RDS(on) typ
-            rds_typ_match = re.search(r'RDS\(on\)[^\d]*typ[^\d]*([\d.]+)\s*mΩ', full_text, re.IGNORECASE)
+            rds_typ_match = _RDS_TYP_RE.search(full_text)
             if not rds_typ_match:
-                rds_typ_match = re.search(r'VGS\s*=\s*10V[^\d]*([\d.]+)\s+([\d.]+)', full_text)
+                rds_typ_match = _RDS_ALT_RE.search(full_text)
                 if rds_typ_match:
                     truth['Ron 10V_type'] = rds_typ_match.group(1) + ' mΩ'
             
             # 提取Ciss
-            ciss_match = re.search(r'Ciss[^\d]*([\d]+)\s*pF', full_text, re.IGNORECASE)
+            ciss_match = _CISS_RE.search(full_text)
             if ciss_match:
                 truth['Ciss'] = ciss_match.group(1) + ' pF'
             
             # 提取Qg
-            qg_match = re.search(r'Qg[^\d]*([\d.]+)\s*nC', full_text)
+            qg_match = _QG_RE.search(full_text)
             if qg_match:
                 truth['Qg'] = qg_match.group(1) + ' nC'
                 
@@ -53,15 +61,21 @@ def extract_ground_truth(pdf_path):
     
     return truth
 
+_norm_cache = {}
+
 def normalize_value(val):
-    """标准化数值用于对比"""
+    """标准化数值用于对比（结果按原始字符串缓存）"""
     if not val:
         return ""
-    # 移除空格，统一小写
-    val = str(val).strip().lower()
-    # 移除单位前的空格
-    val = re.sub(r'\s+', '', val)
-    return val
+    key = str(val)
+    cached = _norm_cache.get(key)
+    if cached is None:
+        # 移除空格，统一小写
+        cached = key.strip().lower()
+        # 移除单位前的空格
+        cached = _WS_RE.sub('', cached)
+        _norm_cache[key] = cached
+    return cached
 
 def compare_values(extracted, expected):
     """对比两个值是否相等"""
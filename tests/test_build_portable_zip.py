@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+便携版打包 write_portable_zip 往返测试
+覆盖预压缩直写路径（含超过内存缓冲的大文件）与缺少 ZipFile 内部属性时的 zf.write 回退路径
+"""
+
+import importlib.util
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+BUILD_SCRIPT = Path(__file__).parent.parent / "build" / "build_portable.py"
+
+
+@pytest.fixture(scope="module")
+def bp():
+    spec = importlib.util.spec_from_file_location("build_portable", BUILD_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def build_dir(tmp_path, bp):
+    root = tmp_path / "build"
+    (root / "app" / "sub").mkdir(parents=True)
+    (root / "__pycache__").mkdir()
+    # 大于 ZIP_SPOOL_SIZE，且跨越多个 ZIP_CHUNK_SIZE 分块
+    (root / "app" / "big.bin").write_bytes(os.urandom(bp.ZIP_CHUNK_SIZE) + b"x" * (2 * bp.ZIP_SPOOL_SIZE))
+    (root / "app" / "sub" / "main.py").write_text("print('hello')\n" * 500, encoding="utf-8")
+    (root / "app" / "empty.txt").write_bytes(b"")
+    (root / "app" / "logo.png").write_bytes(os.urandom(4096))
+    (root / "__pycache__" / "x.pyc").write_bytes(b"\0")
+    return root
+
+
+def _assert_round_trip(zip_path: Path, build_dir: Path):
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        infos = {info.filename: info for info in zf.infolist()}
+        assert sorted(infos) == ["app/big.bin", "app/empty.txt", "app/logo.png", "app/sub/main.py"]
+        for name, info in infos.items():
+            assert zf.read(name) == (build_dir / name).read_bytes()
+        assert infos["app/logo.png"].compress_type == zipfile.ZIP_STORED
+        assert infos["app/sub/main.py"].compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_write_portable_zip_round_trip(bp, build_dir, tmp_path):
+    output = tmp_path / "out.zip"
+    bp.write_portable_zip(build_dir, output)
+    _assert_round_trip(output, build_dir)
+
+
+def test_write_portable_zip_fallback(bp, build_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(bp, "_can_write_deflated", lambda zf: False)
+    output = tmp_path / "out.zip"
+    bp.write_portable_zip(build_dir, output)
+    _assert_round_trip(output, build_dir)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+CacheManager 测试
+覆盖文件后端的分片目录、旧版平铺缓存文件的清理，以及两种磁盘后端保存的都是 set 调用时刻的值
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend import optimize_tools
+from backend.optimize_tools import CacheManager, _cache_key_digest
+
+
+def _use_cache_dir(tmp_path, monkeypatch, backend: str):
+    """让 CacheManager 使用临时目录与指定磁盘后端，并重置单例"""
+    overrides = {"paths.cache_dir": str(tmp_path), "performance.cache_backend": backend}
+    original_get = optimize_tools.config_manager.get
+    monkeypatch.setattr(optimize_tools.config_manager, "get",
+                        lambda key, default=None: overrides.get(key, original_get(key, default)))
+    monkeypatch.setattr(CacheManager, "_instance", None)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """文件后端"""
+    _use_cache_dir(tmp_path, monkeypatch, "file")
+    yield tmp_path
+    monkeypatch.setattr(CacheManager, "_instance", None)
+
+
+@pytest.fixture(params=["file", "auto"])
+def any_cache(request, tmp_path, monkeypatch):
+    """文件后端与 diskcache_rs 后端（未安装时跳过）"""
+    if request.param == "auto" and not optimize_tools.DISKCACHE_RS_AVAILABLE:
+        pytest.skip("diskcache_rs 未安装")
+    _use_cache_dir(tmp_path, monkeypatch, request.param)
+    cache = CacheManager()
+    if request.param == "auto":
+        assert cache._backend is not None
+    yield cache
+    monkeypatch.setattr(CacheManager, "_instance", None)
+
+
+def _write_flat_entry(cache_dir: Path, key: str, value) -> str:
+    """按旧版格式（md5 文件名、无格式前缀的 pickle）平铺写入缓存根目录"""
+    file_name = f"{hashlib.md5(key.encode()).hexdigest()}.pkl"
+    entry = {"value": value, "expire_ts": time.time() + 3600}
+    (cache_dir / file_name).write_bytes(pickle.dumps(entry))
+    return file_name
+
+
+def test_flat_files_removed(cache_dir):
+    for i, key in enumerate(["alpha", "beta", "gamma"]):
+        _write_flat_entry(cache_dir, key, {"key": key, "n": i})
+
+    cache = CacheManager()
+
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".pkl")]
+    assert not list(cache._iter_cache_files())
+    assert cache.get("alpha") is None
+
+
+def test_flat_cleanup_skips_non_cache_files(cache_dir):
+    (cache_dir / "notes.txt").write_text("keep", encoding="utf-8")
+    (cache_dir / "ab").mkdir()
+
+    CacheManager()
+
+    assert (cache_dir / "notes.txt").read_text(encoding="utf-8") == "keep"
+    assert (cache_dir / "ab").is_dir()
+
+
+def test_new_entries_written_to_shards(cache_dir):
+    cache = CacheManager()
+    cache.set("delta", [1, 2, 3])
+    cache.flush()
+
+    file_name = f"{_cache_key_digest('delta')}.pkl"
+    assert (cache_dir / file_name[:2] / file_name[2:4] / file_name).is_file()
+    assert {entry.name for entry in cache._iter_cache_files()} == {file_name}
+
+    # 新实例（清空内存层）从分片目录读取
+    CacheManager._instance = None
+    assert CacheManager().get("delta") == [1, 2, 3]
+
+
+def test_disk_keeps_value_at_set_time(any_cache):
+    value = {"a": [1, 2]}
+    any_cache.set("k", value)
+    value["a"].append(3)
+    any_cache.flush()
+
+    # 清空内存层，强制从磁盘读取
+    any_cache._mem.clear()
+    assert any_cache.get("k") == {"a": [1, 2]}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+按页分片的多进程解析测试
+分片任务的结果须按页序合并，与单进程 parse_pdf 的结果一致
+"""
+
+import sys
+from pathlib import Path
+
+import fitz
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.pdf_parser import PDFParser, _parse_jobs_worker
+
+PAGE_COUNT = 12
+FILE_COUNT = 4  # 多于 3 个文件才会走多进程
+
+
+def _page_text(file_idx: int, page_idx: int) -> str:
+    return (f"Device D{file_idx} marker {page_idx + 1}\n"
+            f"VDS {600 + page_idx} V drain-source voltage\n"
+            f"ID {20 + page_idx} A continuous drain current")
+
+
+@pytest.fixture(scope="module")
+def pdf_folder(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("pdfs")
+    for file_idx in range(FILE_COUNT):
+        with fitz.open() as doc:
+            for page_idx in range(PAGE_COUNT):
+                page = doc.new_page()
+                page.insert_text((72, 200), _page_text(file_idx, page_idx), fontsize=11)
+            doc.save(str(folder / f"device_{file_idx}.pdf"))
+    return folder
+
+
+def _page_summary(content):
+    return [(text.page_num, text.text) for text in content.texts]
+
+
+def test_split_ranges_cover_all_pages(pdf_folder):
+    parser = PDFParser()
+    ranges = parser._split_page_ranges(pdf_folder / "device_0.pdf", 3)
+    assert len(ranges) > 1
+    assert [page for start, stop in ranges for page in range(start, stop)] == list(range(PAGE_COUNT))
+
+
+def test_jobs_worker_returns_results_in_job_order(pdf_folder):
+    pdf_path = str(pdf_folder / "device_0.pdf")
+    jobs = [(pdf_path, 8, 12), (pdf_path, 0, 4), (pdf_path, 4, 8)]
+    results = _parse_jobs_worker(jobs)
+    assert [[text.page_num for text in content.texts] for content in results] == [
+        [9, 10, 11, 12], [1, 2, 3, 4], [5, 6, 7, 8],
+    ]
+    # 只有包含首页的分片提取元数据
+    assert results[1].metadata and not results[0].metadata
+
+
+def test_jobs_worker_isolates_failures(pdf_folder, tmp_path):
+    jobs = [(str(tmp_path / "missing.pdf"), 0, 4), (str(pdf_folder / "device_1.pdf"), 0, 4)]
+    results = _parse_jobs_worker(jobs)
+    assert len(results) == 2
+    assert [text.page_num for text in results[1].texts] == [1, 2, 3, 4]
+
+
+def test_multiprocess_results_in_page_order(pdf_folder):
+    parser = PDFParser()
+    results = parser.batch_parse_multiprocess(str(pdf_folder), max_workers=3)
+
+    assert len(results) == FILE_COUNT
+    for content in results:
+        assert content is not None and not content.error
+        assert content.page_count == PAGE_COUNT
+        assert [text.page_num for text in content.texts] == list(range(1, PAGE_COUNT + 1))
+        expected = parser.parse_pdf(content.file_path)
+        assert _page_summary(content) == _page_summary(expected)
+        assert content.metadata == expected.metadata
+        assert content.product_summary == expected.product_summary
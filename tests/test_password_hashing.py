@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+密码哈希测试
+覆盖 sh256$ 预哈希格式的往返校验、旧版 bcrypt 哈希的兼容校验，以及旧版哈希登录成功后的自动升级
+"""
+
+import sys
+from pathlib import Path
+
+import bcrypt
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.db_manager import DatabaseManager, User
+from backend.user_manager import PREHASH_TAG, UserManager
+
+PASSWORD = "Secret#123"
+
+
+@pytest.fixture
+def user_manager(tmp_path):
+    return UserManager(DatabaseManager(str(tmp_path / "users.db")))
+
+
+def test_prehash_round_trip():
+    hashed = UserManager.hash_password(PASSWORD)
+    assert hashed.startswith(PREHASH_TAG)
+    assert not UserManager.needs_rehash(hashed)
+    assert UserManager.verify_password(PASSWORD, hashed)
+    assert UserManager.verify_password(PASSWORD, hashed.encode("ascii"))
+    assert not UserManager.verify_password(PASSWORD + "x", hashed)
+
+
+def test_prehash_accepts_passwords_beyond_bcrypt_limit():
+    # bcrypt 只使用前 72 字节，预哈希后超长密码的尾部同样参与校验
+    long_password = "a" * 100
+    hashed = UserManager.hash_password(long_password)
+    assert UserManager.verify_password(long_password, hashed)
+    assert not UserManager.verify_password("a" * 99 + "b", hashed)
+
+
+def test_legacy_bcrypt_hash():
+    legacy = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("ascii")
+    assert UserManager.needs_rehash(legacy)
+    assert UserManager.verify_password(PASSWORD, legacy)
+    assert not UserManager.verify_password(PASSWORD + "x", legacy)
+    # 旧版哈希加上预哈希标记后不能再用明文通过校验
+    assert not UserManager.verify_password(PASSWORD, PREHASH_TAG + legacy)
+
+
+def test_invalid_hash_rejected():
+    assert not UserManager.verify_password(PASSWORD, "")
+    assert not UserManager.verify_password(PASSWORD, "not-a-bcrypt-hash")
+    assert not UserManager.verify_password(PASSWORD, PREHASH_TAG + "not-a-bcrypt-hash")
+
+
+def test_login_upgrades_legacy_hash(user_manager):
+    ok, _ = user_manager.create_user("legacy_user", PASSWORD)
+    assert ok
+    legacy = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("ascii")
+    with user_manager.db.session_scope() as session:
+        session.query(User).filter_by(username="legacy_user").update({"password_hash": legacy})
+
+    ok, _, _ = user_manager.authenticate("legacy_user", PASSWORD)
+    assert ok
+    with user_manager.db.session_scope() as session:
+        upgraded = session.query(User).filter_by(username="legacy_user").one().password_hash
+    assert upgraded.startswith(PREHASH_TAG)
+    assert UserManager.verify_password(PASSWORD, upgraded)
+
+    # 升级后的哈希可继续登录，且不会再次改写
+    ok, _, _ = user_manager.authenticate("legacy_user", PASSWORD)
+    assert ok
+    with user_manager.db.session_scope() as session:
+        assert session.query(User).filter_by(username="legacy_user").one().password_hash == upgraded
+
+
+def test_failed_login_keeps_legacy_hash(user_manager):
+    ok, _ = user_manager.create_user("legacy_user", PASSWORD)
+    assert ok
+    legacy = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("ascii")
+    with user_manager.db.session_scope() as session:
+        session.query(User).filter_by(username="legacy_user").update({"password_hash": legacy})
+
+    ok, _, _ = user_manager.authenticate("legacy_user", PASSWORD + "x")
+    assert not ok
+    with user_manager.db.session_scope() as session:
+        assert session.query(User).filter_by(username="legacy_user").one().password_hash == legacy
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+PDFParser._clean_text 测试
+整段正则清洗的结果须与逐行过滤（去首尾空白、丢弃空行、丢弃命中任一过滤模式的行）一致
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.pdf_parser import PDFParser
+
+
+def _reference_clean(text: str) -> str:
+    """逐行过滤的参考实现"""
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or PDFParser._FILTER_RE.search(line):
+            continue
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+SAMPLES = [
+    "",
+    "\n\n  \n",
+    "VDS 100 V\nID 30 A",
+    "  Version 1.2 \n\n12\nPage 3\nVDS 100 V\nCopyright x\n  \nConfidential stuff\nok",
+    "Rev. 2.0\nRDS(on) 99 mΩ\nwww.example.com\n\t\nQg 45 nC\n1 / 10\n",
+    "Parameter Symbol Min Typ Max\nDrain-source voltage V 650\nDSS\n1300\n  3  \nall rights reserved",
+    "page 7 of 9\nTj 150 °C\r\nDatasheet rev. C\nlast line without newline",
+    "trailing spaces   \n   leading spaces\nmiddle  Copyright  line\nend\n\n",
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_clean_text_matches_line_filter(text):
+    assert PDFParser()._clean_text(text) == _reference_clean(text)
+
+
+def test_clean_text_drops_page_numbers():
+    # pdfplumber 没有页眉/页脚区域，纯数字行（页码）由过滤模式去除
+    assert PDFParser()._clean_text("Ciss 1200 pF\n7\nCoss 90 pF") == "Ciss 1200 pF\nCoss 90 pF"